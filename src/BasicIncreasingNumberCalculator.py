@@ -3,25 +3,236 @@
 OVERVIEW
 
 REQUIREMENTS
-- dateutil
 - humanize
+- dateutil (only for times that parse_duration doesn't understand)
+- numpy (only for the --scenarios batch mode)
 
 Date created: around 2023
 THIS IS A SIMPLE CALCULATOR CLI
 This script takes in an Increase Per Second and Time (inputted in a flexible human way)
 This script returns the final number after the Time passes
 The number starts at 0
+
+The time is a duration, e.g. '90', '3d 4h', '1h30m', '2.5 hours', '36:00:00' (hours can go past 24) or 'P1DT2H30M' (ISO-8601).
+Other clock times (like '5pm' or '12:30 PM') fall back to dateutil's parse, like the script always did.
+Anything else, including a signed value like '-5', is rejected instead of being guessed at.
+dateutil and humanize are only imported when needed, so the script starts quickly.
+python BasicIncreasingNumberCalculator.py --benchmark-duration compares parse_duration with the old dateutil path.
+
+Batch mode - evaluates many scenarios from a CSV file at once:
+python BasicIncreasingNumberCalculator.py --scenarios scenarios.csv --output results.csv
+The scenarios file needs the columns 'rate' and 'seconds' (any duration, like '3d 4h'), and can have 'name', 'model', 'start' and 'step_seconds':
+- linear   - start + rate * seconds (the default, same as the interactive mode)
+- compound - start * (1 + rate / 100) ** seconds (rate is a percentage per second)
+- step     - start + rate * floor(seconds / step_seconds) (the number jumps by rate every step_seconds, which must be > 0)
+Results that overflow (or aren't numbers) are left empty, with the reason in the 'error' column.
 ----------------------------------------------------------------------------------------
 """
 
 
+import argparse
+import csv
+import functools
+import math
+import re
+import time
 from datetime import datetime
-from dateutil.parser import parse
-from humanize import intword
 from time import sleep
 
 
-if __name__ == '__main__':
+DURATION_UNIT_SECONDS: dict[str, int] = {
+    'd': 86400, 'day': 86400, 'days': 86400,
+    'h': 3600, 'hr': 3600, 'hrs': 3600, 'hour': 3600, 'hours': 3600,
+    'm': 60, 'min': 60, 'mins': 60, 'minute': 60, 'minutes': 60,
+    's': 1, 'sec': 1, 'secs': 1, 'second': 1, 'seconds': 1,
+}
+DURATION_NUMBER: str = r'(\d+(?:\.\d*)?|\.\d+)'
+DURATION_UNIT: str = r'(' + '|'.join(sorted(DURATION_UNIT_SECONDS, key=len, reverse=True)) + r')(?![a-z])'  # Longest names first
+# Compiled once when the script starts
+DURATION_PLAIN_PATTERN: re.Pattern = re.compile(DURATION_NUMBER)
+DURATION_CLOCK_PATTERN: re.Pattern = re.compile(r'(\d+):([0-5]?\d)(?::([0-5]?\d(?:\.\d*)?))?')
+DURATION_ISO_PATTERN: re.Pattern = re.compile(
+    r'P(?:(\d+(?:\.\d+)?)W)?(?:(\d+(?:\.\d+)?)D)?'
+    r'(?:T(?:(\d+(?:\.\d+)?)H)?(?:(\d+(?:\.\d+)?)M)?(?:(\d+(?:\.\d+)?)S)?)?',
+    re.IGNORECASE)
+DURATION_UNITS_PATTERN: re.Pattern = re.compile(
+    r'(?:\s*' + DURATION_NUMBER + r'\s*' + DURATION_UNIT + r',?)+\s*',
+    re.IGNORECASE)
+DURATION_UNIT_PATTERN: re.Pattern = re.compile(
+    DURATION_NUMBER + r'\s*' + DURATION_UNIT,
+    re.IGNORECASE)
+# What dateutil may still read as a clock time: something like '12:30', '5pm' or '7 a.m.'
+DURATION_CLOCK_TIME_PATTERN: re.Pattern = re.compile(r'\d\s*:\s*\d|\d\s*[ap]\.?\s*m\b\.?', re.IGNORECASE)
+DURATION_CACHE_SIZE: int = 1024
+
+
+GROWTH_MODELS: tuple[str, ...] = ('linear', 'compound', 'step')
+SCENARIOS_OUTPUT_FIELDS: list[str] = ['name', 'model', 'rate', 'seconds', 'start', 'step_seconds', 'result', 'result_words', 'error']
+
+
+@functools.lru_cache(maxsize=DURATION_CACHE_SIZE)
+def parse_duration(text: str) -> float:
+    # Returns the duration in seconds. Repeated inputs come straight from the cache.
+    text = text.strip()
+
+    if DURATION_PLAIN_PATTERN.fullmatch(text):
+        return float(text)
+
+    clock_match: re.Match | None = DURATION_CLOCK_PATTERN.fullmatch(text)
+    if clock_match:
+        # H:MM or H:MM:SS, the hours aren't limited to 24
+        hours, minutes, seconds = clock_match.groups()
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds or 0)
+
+    iso_match: re.Match | None = DURATION_ISO_PATTERN.fullmatch(text)
+    if iso_match and text.upper() not in ('P', 'PT') and not text.upper().endswith('T'):
+        weeks, days, hours, minutes, seconds = (float(value or 0) for value in iso_match.groups())
+        return weeks * 604800 + days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+    if DURATION_UNITS_PATTERN.fullmatch(text):
+        return sum(float(number) * DURATION_UNIT_SECONDS[unit.lower()]
+                   for number, unit in DURATION_UNIT_PATTERN.findall(text))
+
+    # dateutil reads almost anything as some date, e.g. '-5' as the 5th day of the month (0 seconds),
+    # so only clock times are given to it
+    if text[:1] in ('+', '-'):
+        raise ValueError(f"A duration can't have a sign! Value: {text}")
+    if not DURATION_CLOCK_TIME_PATTERN.search(text):
+        raise ValueError(f"This is not a duration or a clock time! Value: {text}")
+
+    return parse_clock_time(text)
+
+
+def parse_clock_time(text: str) -> int:
+    # The old way - reads the text as a clock time, so it can't go past 23:59:59
+    from dateutil.parser import parse
+
+    time_datetime: datetime = parse(text)
+    time_seconds: int = (time_datetime.second +
+                         time_datetime.minute * 60 +
+                         time_datetime.hour * 60 * 60)
+    return time_seconds
+
+
+def benchmark_duration_parser(repeats: int = 10000) -> None:
+    # Compares parse_duration (with an empty and a full cache) with the old dateutil parse path
+    samples: list[str] = ['1:30:00', '12:05', '23:59:59', '0:00:45']  # Inputs that both parsers understand
+    results: dict[str, float] = {}
+
+    import_start: float = time.perf_counter()
+    import dateutil.parser  # noqa: F401 (the first import is the one that takes time)
+    results['dateutil import (once)'] = time.perf_counter() - import_start
+
+    start: float = time.perf_counter()
+    for _ in range(repeats):
+        for sample in samples:
+            parse_clock_time(sample)
+    results['dateutil parse'] = (time.perf_counter() - start) / (repeats * len(samples))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for sample in samples:
+            parse_duration.__wrapped__(sample)
+    results['parse_duration (no cache)'] = (time.perf_counter() - start) / (repeats * len(samples))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for sample in samples:
+            parse_duration(sample)
+    results['parse_duration (cached)'] = (time.perf_counter() - start) / (repeats * len(samples))
+
+    for sample in samples:
+        if parse_duration(sample) != parse_clock_time(sample):
+            raise RuntimeError(f"The parsers disagree! Value: {sample}")
+
+    for name, seconds in results.items():
+        print(f"{name:<28} {seconds * 1e6:>12.3f} us")
+
+
+def read_scenarios(path: str) -> list[dict[str, str]]:
+    with open(path, mode='rt', encoding='utf-8', newline='') as file:
+        scenarios: list[dict[str, str]] = list(csv.DictReader(file))
+
+    for number, scenario in enumerate(scenarios, start=1):
+        model: str = (scenario.get('model') or 'linear').strip().lower()
+        if model not in GROWTH_MODELS:
+            raise ValueError(f"Unknown growth model in scenario {number}! Value: {model}; Allowed: {GROWTH_MODELS}")
+        scenario['model'] = model
+        scenario['name'] = scenario.get('name') or str(number)
+
+        try:
+            parse_duration(scenario.get('seconds') or '0')
+        except ValueError as error:
+            raise ValueError(f"Invalid seconds in scenario {number}! {error}") from None
+
+        step_seconds: str = scenario.get('step_seconds') or '1'
+        try:
+            step_seconds_number: float = float(step_seconds)
+        except ValueError:
+            raise ValueError(f"Invalid step_seconds in scenario {number}! Value: {step_seconds}") from None
+        if not step_seconds_number > 0:
+            raise ValueError(f"step_seconds must be greater than 0 in scenario {number}! Value: {step_seconds}")
+
+    return scenarios
+
+
+def evaluate_scenarios(scenarios: list[dict[str, str]]):
+    # Evaluates every scenario at once with numpy arrays, returns the results as a float64 array
+    import numpy as np  # Imported here so the interactive mode works without numpy
+
+    def column(name: str, default: float):
+        return np.array([float(scenario.get(name) or default) for scenario in scenarios], dtype=np.float64)
+
+    models = np.array([scenario['model'] for scenario in scenarios])
+    rates = column('rate', 0)
+    seconds = np.array([parse_duration(scenario.get('seconds') or '0') for scenario in scenarios], dtype=np.float64)
+    starts = column('start', 0)
+    step_seconds = column('step_seconds', 1)
+
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        linear = starts + rates * seconds
+        compound = starts * np.power(1 + rates / 100, seconds)
+        step = starts + rates * np.floor(seconds / step_seconds)
+
+    return np.select([models == 'compound', models == 'step'], [compound, step], default=linear)
+
+
+def write_scenario_results(scenarios: list[dict[str, str]], results, path: str) -> int:
+    # Rows are written one by one, the humanized text is only made right before writing its row.
+    # Results that aren't finite (e.g. a compound growth past float64) get an empty result and an error instead.
+    # Returns the amount of such rows.
+    from humanize import intword
+
+    failed: int = 0
+
+    with open(path, mode='wt', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=SCENARIOS_OUTPUT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+
+        for scenario, result in zip(scenarios, results.tolist()):
+            if math.isfinite(result):
+                writer.writerow({**scenario, 'result': result, 'result_words': intword(result, "%0.3f"), 'error': ''})
+            else:
+                writer.writerow({**scenario, 'result': '', 'result_words': '',
+                                 'error': 'overflow' if math.isinf(result) else 'not a number'})
+                failed += 1
+
+    return failed
+
+
+def calculate_scenarios(scenarios_path: str, output_path: str) -> None:
+    scenarios: list[dict[str, str]] = read_scenarios(scenarios_path)
+    results = evaluate_scenarios(scenarios)
+    failed: int = write_scenario_results(scenarios, results, output_path)
+    print(f"Calculated {len(scenarios):,} scenarios! Results: {output_path}")
+
+    if failed:
+        print(f"WARNING: {failed:,} scenarios have no valid result (see their 'error' column)!")
+
+
+def calculate_interactively() -> None:
+    from humanize import intword
+
     # ips - increase per second
 
     while True:
@@ -42,13 +253,24 @@ if __name__ == '__main__':
     print("")
     print(f"Increase Per Second: {ips_number:,}")
 
-    print("")
-    time_text: str = input("Please Input Time: ")
+    while True:
+        print("")
+        time_text: str = input("Please Input Time: ")
+
+        try:
+            time_seconds: int | float = parse_duration(time_text)
+            break
+        except ValueError:
+            print("")
+            print("===========================>")
+            print("This is not a valid time!")
+            print("Retrying in 1 second!")
+            print("<===========================")
+            sleep(1)
+
+    if float(time_seconds).is_integer():
+        time_seconds = int(time_seconds)  # Printed as 5,400 instead of 5,400.0
 
-    time_datetime: datetime = parse(time_text)
-    time_seconds: int = (time_datetime.second +
-                        time_datetime.minute * 60 +
-                        time_datetime.hour * 60 * 60)
     print("")
     print(f"Time: {time_seconds:,} seconds")
 
@@ -66,3 +288,22 @@ if __name__ == '__main__':
     print(sum_text)
 
     input("\nEnd...")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calculates a number increasing over time. Runs interactively without arguments.")
+    parser.add_argument('--scenarios', default=None, help="A CSV file with many scenarios to calculate at once.")
+    parser.add_argument('--output', default='results.csv', help="Where to write the results of --scenarios.")
+    parser.add_argument('--benchmark-duration', action='store_true', help="Compare the duration parser with dateutil's parse.")
+    arguments: argparse.Namespace = parser.parse_args()
+
+    if arguments.benchmark_duration:
+        benchmark_duration_parser()
+    elif arguments.scenarios is not None:
+        calculate_scenarios(arguments.scenarios, arguments.output)
+    else:
+        calculate_interactively()
+
+
+if __name__ == '__main__':
+    main()
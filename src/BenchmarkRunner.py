@@ -0,0 +1,306 @@
+"""
+----------------------------------------------------------------------------------------
+OVERVIEW
+
+REQUIREMENTS
+- none (each benchmark only needs the requirements of the script it measures,
+  if they're missing that benchmark is skipped)
+
+Date created: 19.10.2026
+This script measures the hot paths of the other scratches in this directory:
+- substrings   - SubstringCounter.find_unique_repeat_substrings
+- permutations - PermutationsGenerator.get_permutations
+- immortals    - ClickerHeroesImmortalHealthCalculator.get_immortal_health_for_range_message
+- songs        - BulkMusicTempoChecker.collect_song_files
+- timetable    - HTMLTimeTableToCalcConverter.convert_table (to .ods)
+
+The scripts are imported from their files by name, so only their functions are loaded - none of their
+interactive parts or main() run. A benchmark whose script can't be imported here is recorded as skipped,
+but any error while it runs stops the runner. Every benchmark is a sweep over a few input sizes, with synthetic inputs made
+on the spot (random text, temporary directories and HTML files), so nothing has to be downloaded.
+
+For every size the best wall time of a few repeats is kept, and the peak memory (tracemalloc) is measured
+in one extra run, because tracing slows the code down. Each run is appended to a JSON history file, and the
+results are compared with the previous run of the same benchmark and size (on the same python version) -
+anything slower or bigger by more than the threshold (or skipped after working) is reported as a regression:
+python BenchmarkRunner.py
+python BenchmarkRunner.py --only substrings timetable --repeats 5 --threshold 0.1 --fail-on-regression
+----------------------------------------------------------------------------------------
+"""
+
+
+import argparse
+import importlib.util
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from types import ModuleType
+
+
+SCRIPTS_PATH: Path = Path(__file__).resolve().parent
+HISTORY_PATH: Path = SCRIPTS_PATH / 'benchmark_history.json'
+RANDOM_SEED: int = 2023
+DEFAULT_REPEATS: int = 3
+DEFAULT_THRESHOLD: float = 0.25  # 25% slower (or bigger) than the previous run counts as a regression
+MIN_COMPARED_SECONDS: float = 0.001  # Shorter timings are mostly noise, so they're never flagged
+
+WORDS: list[str] = ['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit', 'sed', 'do',
+                    'eiusmod', 'tempor', 'incididunt', 'ut', 'labore', 'et', 'dolore', 'magna', 'aliqua']
+SONG_EXTENSIONS: list[str] = ['.mp3', '.flac', '.wav', '.ogg', '.txt', '.jpg']
+
+
+def import_script(name: str) -> ModuleType:
+    # Imports a script from this directory without running it (all of them keep main() behind __name__)
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_PATH / f'{name}.py')
+    module: ModuleType = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+
+    return module
+
+
+def get_random_text(size: int) -> str:
+    generator: random.Random = random.Random(RANDOM_SEED)
+    text: str = ' '.join(generator.choices(WORDS, k=size // 5))
+    return text[:size]
+
+
+def write_song_tree(path: Path, size: int) -> Path:
+    # size empty files spread over nested folders - collect_song_files only looks at the names
+    generator: random.Random = random.Random(RANDOM_SEED)
+
+    for number in range(size):
+        folder: Path = path / f'album_{number % 20}' / f'disc_{number % 3}'
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f'song_{number}{generator.choice(SONG_EXTENSIONS)}').touch()
+
+    return path
+
+
+def write_time_table(path: Path, size: int) -> Path:
+    # A table with size rows, some cells spanning two rows like the real time tables do
+    generator: random.Random = random.Random(RANDOM_SEED)
+
+    with open(path, mode='wt', encoding='utf-8') as file:
+        file.write('<html><body><table>\n<tr><th>Time</th><th>Mon</th><th>Tue</th><th>Wed</th><th>Thu</th><th>Fri</th></tr>\n')
+
+        for row in range(size):
+            cells: list[str] = [f'<td>{row // 4 + 8}:{row % 4 * 15:02}</td>']
+            for day in range(5):
+                if row % 2 == 0 and day == row % 5:
+                    cells.append(f'<td rowspan="2">{generator.choice(WORDS)} {generator.randint(1, 300)}</td>')
+                elif row % 2 == 1 and day == (row - 1) % 5:
+                    continue
+                else:
+                    cells.append(f'<td>{generator.randint(1, 300)}</td>')
+            file.write(f'<tr>{"".join(cells)}</tr>\n')
+
+        file.write('</table></body></html>\n')
+
+    return path
+
+
+def prepare_substrings(module: ModuleType, size: int) -> Callable[[], object]:
+    text: str = get_random_text(size)
+    return lambda: module.find_unique_repeat_substrings(text, 4, 4)
+
+
+def prepare_permutations(module: ModuleType, size: int) -> Callable[[], object]:
+    items: list[int] = list(range(size))
+    return lambda: module.get_permutations(items)
+
+
+def prepare_immortals(module: ModuleType, size: int) -> Callable[[], object]:
+    return lambda: module.get_immortal_health_for_range_message(1, size)
+
+
+def prepare_songs(module: ModuleType, size: int, temporary_path: Path) -> Callable[[], object]:
+    module.log = lambda msg: None  # Its debug logs would flood the output (and the timings)
+    songs_path: Path = write_song_tree(temporary_path / 'Songs', size)
+    return lambda: module.collect_song_files(songs_path, fatal=False)
+
+
+def prepare_timetable(module: ModuleType, size: int, temporary_path: Path) -> Callable[[], object]:
+    input_path: Path = write_time_table(temporary_path / 'table.html', size)
+    output_path: Path = temporary_path / 'table.ods'
+    return lambda: module.convert_table(input_path, output_path)
+
+
+# name -> (script, prepare function, sizes, whether it needs a temporary directory)
+BENCHMARKS: dict[str, tuple[str, Callable, list[int], bool]] = {
+    'substrings': ('SubstringCounter', prepare_substrings, [1000, 4000, 16000], False),
+    'permutations': ('PermutationsGenerator', prepare_permutations, [4, 5, 6], False),
+    'immortals': ('ClickerHeroesImmortalHealthCalculator', prepare_immortals, [1000, 10000, 30000], False),
+    'songs': ('BulkMusicTempoChecker', prepare_songs, [100, 1000, 5000], True),
+    'timetable': ('HTMLTimeTableToCalcConverter', prepare_timetable, [1000, 5000, 20000], True),
+}
+
+
+def measure(function: Callable[[], object], repeats: int) -> dict[str, float | int]:
+    best_seconds: float = float('inf')
+
+    for _ in range(repeats):
+        start: float = time.perf_counter()
+        function()
+        best_seconds = min(best_seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': best_seconds, 'peak_bytes': peak_bytes}
+
+
+def run_benchmark(name: str, repeats: int) -> dict[str, dict]:
+    # size (as a string, like it's stored in JSON) -> measurements, or {'error': ...} if the script can't be imported here.
+    # Only the import is allowed to fail, errors while measuring are real breakage and aren't caught.
+    script, prepare, sizes, needs_directory = BENCHMARKS[name]
+
+    try:
+        module: ModuleType = import_script(script)
+    except (ImportError, SyntaxError) as error:
+        # e.g. a missing requirement, or a script that needs a newer python
+        return {str(size): {'error': f'{type(error).__name__}: {error}'} for size in sizes}
+
+    results: dict[str, dict] = {}
+
+    for size in sizes:
+        if needs_directory:
+            with tempfile.TemporaryDirectory() as temporary_directory:
+                results[str(size)] = measure(prepare(module, size, Path(temporary_directory)), repeats)
+        else:
+            results[str(size)] = measure(prepare(module, size), repeats)
+
+    return results
+
+
+def load_history(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+
+    with open(path, mode='rt', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_history(path: Path, history: list[dict]) -> None:
+    # Written to a temporary file first, so an interrupted run never leaves a broken history
+    temporary: Path = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps(history, indent=2), encoding='utf-8')
+    temporary.replace(path)
+
+
+def get_previous_result(history: list[dict], name: str, size: str) -> None | dict:
+    # The latest successful measurement of this benchmark and size on the same python version
+    # (timings from different versions aren't comparable)
+    for run in reversed(history):
+        if run['python'] != platform.python_version():
+            continue
+        result: None | dict = run['results'].get(name, {}).get(size)
+        if result is not None and 'error' not in result:
+            return result
+    return None
+
+
+def find_regressions(history: list[dict], results: dict[str, dict[str, dict]], threshold: float) -> list[str]:
+    regressions: list[str] = []
+
+    for name, sizes in results.items():
+        for size, result in sizes.items():
+            previous: None | dict = get_previous_result(history, name, size)
+            if previous is None:
+                continue
+
+            if 'error' in result:
+                regressions.append(f"{name} (size {size}): worked before, now {result['error']}")
+                continue
+
+            if result['seconds'] >= MIN_COMPARED_SECONDS and result['seconds'] > previous['seconds'] * (1 + threshold):
+                regressions.append(f"{name} (size {size}): time {previous['seconds']:.4f} s -> {result['seconds']:.4f} s "
+                                   f"({result['seconds'] / previous['seconds'] - 1:+.0%})")
+
+            if previous['peak_bytes'] and result['peak_bytes'] > previous['peak_bytes'] * (1 + threshold):
+                regressions.append(f"{name} (size {size}): peak memory {previous['peak_bytes']:,} B -> "
+                                   f"{result['peak_bytes']:,} B ({result['peak_bytes'] / previous['peak_bytes'] - 1:+.0%})")
+
+    return regressions
+
+
+def print_results(results: dict[str, dict[str, dict]]) -> None:
+    print(f"{'benchmark':<14} {'size':>8} {'time':>12} {'peak memory':>16}")
+
+    for name, sizes in results.items():
+        for size, result in sizes.items():
+            if 'error' in result:
+                print(f"{name:<14} {size:>8}   skipped - {result['error']}")
+            else:
+                print(f"{name:<14} {size:>8} {result['seconds'] * 1000:>9.2f} ms {result['peak_bytes'] / 1024:>13,.0f} KiB")
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks the hot paths of the scratches and keeps a history of the results.")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS), help="The benchmarks to run.")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="Timed runs per size (the best one is kept).")
+    parser.add_argument('--history', type=Path, default=HISTORY_PATH, help="The JSON file with the results of previous runs.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="How much slower or bigger (0.25 = 25%%) than the previous run counts as a regression.")
+    parser.add_argument('--no-save', action='store_true', help="Don't add this run to the history.")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with code 1 if there are regressions.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    arguments: argparse.Namespace = parse_arguments()
+    results: dict[str, dict[str, dict]] = {}
+
+    for name in arguments.only:
+        print(f"Running {name}...")
+        results[name] = run_benchmark(name, arguments.repeats)
+
+    print("")
+    print_results(results)
+
+    history: list[dict] = load_history(arguments.history)
+    regressions: list[str] = find_regressions(history, results, arguments.threshold)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) since the previous run:")
+        for regression in regressions:
+            print(f"- {regression}")
+    elif history:
+        print("\nNo regressions since the previous run!")
+
+    if not arguments.no_save:
+        history.append({
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': arguments.repeats,
+            'results': results,
+        })
+        save_history(arguments.history, history)
+        print(f"\nSaved to {arguments.history}")
+
+    if regressions and arguments.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,12 +10,22 @@ Date created: 22.06.2023
 You have a base city. Let's name it A
 And a list of other cities. Let's name them Bs
 This program will rank Bs by how close they are to A
+
+Every geocoded place is saved to a local cache (geocode_cache_path). Before asking Nominatim, each city is first
+looked up in a character n-gram index over the cache (and over an optional gazetteer CSV with the columns
+name,country,latitude,longitude). If the best local match is similar enough (fuzzy_match_threshold), its coordinates
+are used right away. That way misspellings, missing diacritics and repeated runs don't cost a 1-second request each.
+Places Nominatim couldn't find are cached too (as null), so known misses are skipped without a request as well.
 ----------------------------------------------------------------------------------------
 """
 
+import csv
+import json
+import unicodedata
 from base64 import b64encode
 from hashlib import pbkdf2_hmac
-from math import sin
+from math import ceil, sin
+from pathlib import Path
 from operator import itemgetter
 from platform import node, processor
 from time import sleep
@@ -47,6 +57,137 @@ def compare_strings(str1, str2: str):
     return (str1_char_counts == str2_chat_counts and len(str1) == len(str2), str1_char_counts, str2_chat_counts)
 
 
+# Letters that unicodedata can't split into a base letter and a diacritic
+NAME_TRANSLITERATIONS: dict[int, str] = str.maketrans({"ł": "l", "ø": "o", "đ": "d", "ß": "ss", "æ": "ae", "œ": "oe", "ı": "i"})
+
+
+def normalize_place_name(name: str) -> str:
+    # "Białystok,  POLAND" -> "bialystok poland"
+    decomposed: str = unicodedata.normalize("NFKD", name.casefold().translate(NAME_TRANSLITERATIONS))
+    without_marks: str = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join("".join(char if char.isalnum() else " " for char in without_marks).split())
+
+
+class PlaceNameIndex:
+    # An inverted index from character n-grams to place names, scored with the Dice coefficient of their
+    # n-gram sets (1.0 means the same normalized name).
+    # To score at least min_score, a name has to share a minimum number of n-grams with the query, so it must
+    # contain at least one of the query's rarest n-grams. Only those short posting lists are read, which skips
+    # very common n-grams (like the ones of ", Poland") entirely.
+
+    def __init__(self, n: int = 3) -> None:
+        self.n: int = n
+        self.names: list[str] = []
+        self.coordinates: list[tuple[float, float]] = []
+        self.grams: list[frozenset[str]] = []
+        self.postings: dict[str, list[int]] = {}
+        self.ids: dict[str, int] = {}
+
+    def get_grams(self, name: str) -> set[str]:
+        padded: str = f" {normalize_place_name(name)} "
+        return {padded[index:index + self.n] for index in range(max(len(padded) - self.n + 1, 1))}
+
+    def add(self, name: str, coordinates: tuple[float, float]) -> None:
+        key: str = normalize_place_name(name)
+        if key in self.ids:
+            self.coordinates[self.ids[key]] = coordinates
+            return
+
+        place_id: int = len(self.names)
+        grams: set[str] = self.get_grams(name)
+        self.ids[key] = place_id
+        self.names.append(name)
+        self.coordinates.append(coordinates)
+        self.grams.append(frozenset(grams))
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(place_id)
+
+    def search(self, query: str, limit: int = 5,
+               min_score: float = 0.5) -> list[tuple[float, str, tuple[float, float]]]:
+        # The best matches scoring at least min_score as (score, name, coordinates), best first
+        exact_id: int | None = self.ids.get(normalize_place_name(query))
+        if exact_id is not None:
+            return [(1.0, self.names[exact_id], self.coordinates[exact_id])]
+
+        grams: set[str] = self.get_grams(query)
+        # dice = 2 * shared / (len(query) + len(name)) >= min_score needs at least this many shared n-grams
+        min_shared: int = max(ceil(min_score * len(grams) / (2 - min_score)), 1)
+        rarest: list[str] = sorted(grams, key=lambda gram: len(self.postings.get(gram, ())))
+        candidates: set[int] = set()
+        for gram in rarest[:len(grams) - min_shared + 1]:
+            candidates.update(self.postings.get(gram, ()))
+
+        scored: list[tuple[float, int]] = []
+        for place_id in candidates:
+            place_grams: frozenset[str] = self.grams[place_id]
+            score: float = 2 * len(grams & place_grams) / (len(grams) + len(place_grams))
+            if score >= min_score:
+                scored.append((score, place_id))
+        scored.sort(reverse=True)
+
+        return [(score, self.names[place_id], self.coordinates[place_id]) for score, place_id in scored[:limit]]
+
+
+def load_geocode_cache(path: Path) -> dict[str, tuple[float, float] | None]:
+    # None - Nominatim didn't find the place
+    if not path.exists():
+        return {}
+
+    with open(path, mode="rt", encoding="utf-8") as file:
+        return {
+            name: None if coordinates is None else (coordinates[0], coordinates[1])
+            for name, coordinates in json.load(file).items()
+        }
+
+
+def save_geocode_cache(path: Path, cache: dict[str, tuple[float, float] | None]) -> None:
+    with open(path, mode="wt", encoding="utf-8") as file:
+        json.dump(cache, file, ensure_ascii=False, indent=2)
+
+
+def build_place_name_index(cache: dict[str, tuple[float, float] | None], gazetteer_path: Path | None) -> PlaceNameIndex:
+    index: PlaceNameIndex = PlaceNameIndex()
+
+    if gazetteer_path is not None and gazetteer_path.exists():
+        with open(gazetteer_path, mode="rt", encoding="utf-8", newline="") as file:
+            for row in csv.DictReader(file):
+                name: str = f"{row['name']}, {row['country']}" if row.get("country") else row["name"]
+                index.add(name, (float(row["latitude"]), float(row["longitude"])))
+
+    # The cache goes last, so its coordinates win over the gazetteer's
+    for name, coordinates in cache.items():
+        if coordinates is not None:
+            index.add(name, coordinates)
+
+    return index
+
+
+def locate_place(query: str, geolocator: Any, index: PlaceNameIndex, cache: dict[str, tuple[float, float] | None],
+                 threshold: float) -> tuple[tuple[float, float] | None, str]:
+    # Returns the coordinates (None if not found) and where they came from.
+    # Only falls through to Nominatim (a network request) when no local match is good enough
+    # and the place isn't a known miss.
+    matches: list[tuple[float, str, tuple[float, float]]] = index.search(query, limit=1, min_score=threshold)
+
+    if matches and matches[0][0] >= threshold:
+        score, name, coordinates = matches[0]
+        return coordinates, f"local match '{name}' ({score:.2f})"
+
+    if query in cache and cache[query] is None:
+        return None, "cached miss"
+
+    location: Any = geolocator.geocode(query)
+    if not location:
+        cache[query] = None
+        return None, "geocoded"
+
+    coordinates = (location.latitude, location.longitude)
+    cache[query] = coordinates
+    index.add(query, coordinates)
+
+    return coordinates, "geocoded"
+
+
 def count_cities(my_cities_dict: dict) -> int:
     cites_count: int = 0
 
@@ -117,6 +258,10 @@ def main() -> None:
 
     min_wait_seconds: int | float = -999  # Disabled. If you break the tos its your fault :)
 
+    geocode_cache_path: Path = Path("geocode_cache.json")
+    gazetteer_path: Path | None = None  # A CSV with the columns name,country,latitude,longitude
+    fuzzy_match_threshold: float = 0.8  # 0-1, how similar a local name must be to skip Nominatim (1 - only exact matches)
+
     # ============================== END OF CONFIGURATION: =============================
 
     if wait_seconds < min_wait_seconds:
@@ -129,15 +274,19 @@ def main() -> None:
     # Nominatim also requires a user_agent name for every Nominatim-using application.
     geolocator: Nominatim = Nominatim(user_agent=user_agent)
 
-    my_city_location: Any = geolocator.geocode(city)
+    cache: dict[str, tuple[float, float] | None] = load_geocode_cache(geocode_cache_path)
+    index: PlaceNameIndex = build_place_name_index(cache, gazetteer_path)
+
+    my_main_location_coordinates: tuple | None
+    my_main_location_coordinates, source = locate_place(city, geolocator, index, cache, fuzzy_match_threshold)
 
-    if not my_city_location:
+    if not my_main_location_coordinates:
         print(f"Couldn't get the Location of '{city}'!")
+        save_geocode_cache(geocode_cache_path, cache)
         return
 
-    sleep(wait_seconds)
-
-    my_main_location_coordinates: tuple = (my_city_location.latitude, my_city_location.longitude)
+    if source == "geocoded":
+        sleep(wait_seconds)
 
     distances: list = []
     skipped_cities: list = []
@@ -150,21 +299,25 @@ def main() -> None:
 
             print(f"{count}/{cities_amount}  |  Getting the city {city}", end="")
 
-            city_location = geolocator.geocode(f"{city}, {outer_location}")
+            city_coordinates, source = locate_place(f"{city}, {outer_location}", geolocator, index, cache,
+                                                    fuzzy_match_threshold)
 
-            if not city_location:
+            if not city_coordinates:
                 skipped_cities.append(f"{city}, {outer_location}")
-                print("  |  CITY NOT FOUND!!! | SKIPPED!")
+                print(f"  |  CITY NOT FOUND!!! | SKIPPED!  |  {source}")
+                if source == "geocoded":
+                    sleep(wait_seconds)
                 continue
 
-            city_coordinates: tuple = (city_location.latitude, city_location.longitude)
-
             distance = geodesic(my_main_location_coordinates, city_coordinates).kilometers
             distances.append((city, distance))
 
-            print(f"  |  Distance - {distance:.{results_decimal_places}f} kilometers")
+            print(f"  |  Distance - {distance:.{results_decimal_places}f} kilometers  |  {source}")
+
+            if source == "geocoded":
+                sleep(wait_seconds)
 
-            sleep(wait_seconds)
+    save_geocode_cache(geocode_cache_path, cache)
 
     distances.sort(key=itemgetter(1))
 
@@ -22,6 +22,11 @@ Date created:
 This is a simple script I wrote to check the bpm (very approximately) of all the songs in large album I've found
 This is a very cpu-heavy process
 Also keep in mind that the results aren't perfectly accurate (though I think librosa does a good-enough job)
+
+Besides the tempo, the script can extract more features in the same pass (see FEATURES in # Settings):
+tempo, beats (beat positions in seconds), key (estimated from the chroma), loudness (RMS in dBFS) and duration
+Every file is decoded only once, and the features share their intermediates (the spectrogram, the onset envelope...),
+so each extra feature costs only a fraction of a full pass
 ----------------------------------------------------------------------------------------
 """
 
@@ -31,6 +36,7 @@ from typing import Any
 from types import FrameType
 import inspect
 import functools
+import json
 from pathlib import Path
 import os
 import concurrent.futures
@@ -42,6 +48,9 @@ import sys
 
 # SETTINGS
 SONGS_PATH: Path = Path("./Songs")
+FEATURES: tuple[str, ...] = ("tempo",)  # Any of: tempo, beats, key, loudness, duration (just "tempo" gives the old output)
+OUTPUT_FEATURES_JSON_PATH: Path | None = None  # If set, all the features (with every beat position) are also saved here
+OUTPUT_SORT_FEATURE: str = "tempo"  # Used when sorting the features table (falls back to the first feature)
 OUTPUT_RAW: bool = False
 OUTPUT_SORT: bool = True
 OUTPUT_SORT_REVERSE: bool = True  # Normal order is lowest->highest
@@ -132,19 +141,110 @@ def collect_song_files(path: Path, fatal: bool) -> list[Path]:
     return files_p
 
 
-def get_tempo(file: Path) -> float:
-    log(f"Getting tempo{s}{file=}")
+# fmt:off
+AVAILABLE_FEATURES: tuple[str, ...] = ("tempo", "beats", "key", "loudness", "duration")
+PITCH_CLASSES: tuple[str, ...] = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+# Krumhansl-Schmuckler key profiles (for C major and C minor)
+MAJOR_KEY_PROFILE: tuple[float, ...] = (6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88)
+MINOR_KEY_PROFILE: tuple[float, ...] = (6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17)
+# fmt:on
+
+
+class AudioFeatures:
+    # Holds one decoded file and computes every intermediate at most once, when the first feature needs it.
+    # The magnitude spectrogram is shared by the onset envelope (tempo, beats), the chroma (key) and the RMS (loudness).
+
+    def __init__(
+        self, audio_time_series: np.ndarray[Any, Any], sample_rate: int | float
+    ) -> None:
+        self.y: np.ndarray[Any, Any] = audio_time_series
+        self.sr: int | float = sample_rate
+
+    @functools.cached_property
+    def magnitude_spectrogram(self) -> np.ndarray[Any, Any]:
+        return np.abs(librosa.stft(self.y))  # type: ignore
+
+    @functools.cached_property
+    def power_spectrogram(self) -> np.ndarray[Any, Any]:
+        return self.magnitude_spectrogram**2
+
+    @functools.cached_property
+    def onset_envelope(self) -> np.ndarray[Any, Any]:
+        # The envelope librosa.beat.beat_track(y=...) builds internally (median across the mel bands),
+        # but from the shared spectrogram, so tempo and beats stay the same as the old get_tempo
+        mel: np.ndarray[Any, Any] = librosa.feature.melspectrogram(S=self.power_spectrogram, sr=self.sr)  # type: ignore
+        return librosa.onset.onset_strength(S=librosa.power_to_db(mel), sr=self.sr, aggregate=np.median)  # type: ignore
+
+    @functools.cached_property
+    def beat_track(self) -> tuple[Any, np.ndarray[Any, Any]]:
+        tempo: Any | np.ndarray[Any, Any]
+        beat_frames: np.ndarray[Any, Any]
+        tempo, beat_frames = librosa.beat.beat_track(onset_envelope=self.onset_envelope, sr=self.sr)  # type: ignore
+        return tempo, beat_frames
+
+    def tempo(self) -> float:
+        return interpret_tempo(self.beat_track[0])
+
+    def beats(self) -> list[float]:
+        beat_times: np.ndarray[Any, Any] = librosa.frames_to_time(self.beat_track[1], sr=self.sr)  # type: ignore
+        return [float(beat_time) for beat_time in beat_times]
+
+    def key(self) -> str:
+        chroma: np.ndarray[Any, Any] = librosa.feature.chroma_stft(S=self.power_spectrogram, sr=self.sr)  # type: ignore
+        return estimate_key(chroma.mean(axis=1))
+
+    def loudness(self) -> float:
+        rms: np.ndarray[Any, Any] = librosa.feature.rms(S=self.magnitude_spectrogram)  # type: ignore
+        mean_rms: float = float(rms.mean())
+        return float(20 * np.log10(mean_rms)) if mean_rms > 0 else float("-inf")
+
+    def duration(self) -> float:
+        return len(self.y) / self.sr
+
+
+def estimate_key(chroma_means: np.ndarray[Any, Any]) -> str:
+    # The key whose (rotated) profile correlates best with the average chroma
+    best_key: str = ""
+    best_correlation: float = float("-inf")
+    for mode, profile in (("major", MAJOR_KEY_PROFILE), ("minor", MINOR_KEY_PROFILE)):
+        for tonic in range(len(PITCH_CLASSES)):
+            rotated: np.ndarray[Any, Any] = np.roll(np.asarray(profile), tonic)
+            correlation: float = float(np.corrcoef(chroma_means, rotated)[0, 1])
+            if correlation > best_correlation:
+                best_correlation = correlation
+                best_key = f"{PITCH_CLASSES[tonic]} {mode}"
+    return best_key
+
+
+def check_features(features: tuple[str, ...]) -> None:
+    unknown: list[str] = [
+        feature for feature in features if feature not in AVAILABLE_FEATURES
+    ]
+    if unknown or not features:
+        raise RuntimeError(
+            f"Unknown or no features{s}{unknown=}{s}{AVAILABLE_FEATURES=}"
+        )
+
+
+def get_features(file: Path, features: tuple[str, ...]) -> dict[str, Any]:
+    log(f"Getting features{s}{file=}{s}{features=}")
+    check_features(features)
     file_log: str = str(file)
     log(f"Loading{s}{file_log}")
     audio_time_series: np.ndarray[Any, Any]  # librosa doesn't tell us the type
     sample_rate: int | float
     audio_time_series, sample_rate = librosa.load(file)  # type: ignore
-    log(f"Getting tempo{s}{file_log}")
-    tempo: Any | np.ndarray[Any, Any]
-    tempo, _ = librosa.beat.beat_track(y=audio_time_series, sr=sample_rate)  # type: ignore
-    log(f"Interpreting tempo{s}{file_log}")
-    tempo_f: float = interpret_tempo(tempo)
+    audio_features: AudioFeatures = AudioFeatures(audio_time_series, sample_rate)
+    results: dict[str, Any] = {}
+    for feature in features:
+        log(f"Getting {feature}{s}{file_log}")
+        results[feature] = getattr(audio_features, feature)()
     log(f"Completed{s}{file_log}")
+    return results
+
+
+def get_tempo(file: Path) -> float:
+    tempo_f: float = get_features(file, ("tempo",))["tempo"]
     return tempo_f
 
 
@@ -174,6 +274,69 @@ def get_song_tempos(files: list[Path]) -> list[tuple[Path, float]]:
     return song_tempos
 
 
+def get_song_features(
+    files: list[Path], features: tuple[str, ...]
+) -> list[tuple[Path, dict[str, Any]]]:
+    log(f"Getting many song features{s}Files amount: {len(files)}{s}{features=}")
+    get_these_features = functools.partial(get_features, features=features)
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=GET_SONG_TEMPOS_MAX_WORKERS
+    ) as exec:
+        results: list[dict[str, Any]] = list(exec.map(get_these_features, files))
+    song_features: list[tuple[Path, dict[str, Any]]] = list(zip(files, results))
+    log("Finished getting many song features")
+    return song_features
+
+
+def format_feature(feature: str, value: Any) -> str:
+    if feature == "beats":
+        return f"{len(value)} beats"
+    if feature == "loudness":
+        return f"{value:.2f} dBFS"
+    if feature == "duration":
+        return f"{value:.2f}s"
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def sort_song_features(
+    song_features: list[tuple[Path, dict[str, Any]]], feature: str, reverse: bool
+) -> list[tuple[Path, dict[str, Any]]]:
+    def sortkey(song_feature: tuple[Path, dict[str, Any]]) -> Any:
+        value: Any = song_feature[1][feature]
+        return len(value) if feature == "beats" else value
+
+    return list(sorted(song_features, key=sortkey, reverse=reverse))
+
+
+def format_song_features(
+    song_features: list[tuple[Path, dict[str, Any]]],
+    features: tuple[str, ...],
+    name_as_title: bool,
+) -> str:
+    log(f"Formatting many song features{s}Songs amount: {len(song_features)}")
+    lines: list[str] = []
+    for file, results in song_features:
+        name: str = file.name if name_as_title else str(file)
+        columns: list[str] = [
+            format_feature(feature, results[feature]) for feature in features
+        ]
+        lines.append(ts.join([*columns, name]))
+    return "\n".join(lines)
+
+
+def save_song_features_json(
+    song_features: list[tuple[Path, dict[str, Any]]], path: Path
+) -> None:
+    log(f"Saving song features{s}{path=}")
+    data: list[dict[str, Any]] = [
+        {"file": str(file), **results} for file, results in song_features
+    ]
+    with open(path, mode="wt", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+
+
 def format_song_tempo(
     song_tempo: tuple[Path, float], tempo_rounding: int, name_as_title: bool
 ) -> str:
@@ -229,11 +392,46 @@ def print_formatted_song_tempos(song_tempos: str) -> None:
     print(text)
 
 
+def print_song_features(song_features: str, features: tuple[str, ...]) -> None:
+    divider = (
+        OUTPUT_SONG_TEMPOS_TABLE_DIVIDER_CHAR * OUTPUT_SONG_TEMPOS_TABLE_DIVIDER_AMOUNT
+    )
+    header: str = ts.join([*(feature.upper() for feature in features), "TITLE"])
+    print("\n".join([divider, header, song_features, divider]))
+
+
+def main_features(files: list[Path], features: tuple[str, ...]) -> None:
+    song_features: list[tuple[Path, dict[str, Any]]] = get_song_features(
+        files, features
+    )
+    if OUTPUT_FEATURES_JSON_PATH is not None:
+        save_song_features_json(song_features, OUTPUT_FEATURES_JSON_PATH)
+    if OUTPUT_SORT:
+        sort_feature: str = (
+            OUTPUT_SORT_FEATURE if OUTPUT_SORT_FEATURE in features else features[0]
+        )
+        song_features = sort_song_features(
+            song_features, sort_feature, reverse=OUTPUT_SORT_REVERSE
+        )
+    formatted: str = format_song_features(
+        song_features, features, name_as_title=OUTPUT_ONLY_FILENAME_AS_TITLE
+    )
+    if OUTPUT_RAW:
+        print(formatted)
+    else:
+        print_song_features(formatted, features)
+        print("Program end")
+
+
 def main() -> None:
+    check_features(FEATURES)
     if not OUTPUT_RAW:
         print("Working...")
         print(f"Allowed Extensions Are:{s}{s.join(get_allowed_extensions())}")
     files: list[Path] = collect_song_files(SONGS_PATH, fatal=IS_MISSING_SONGS_DIR_FATAL)
+    if FEATURES != ("tempo",) or OUTPUT_FEATURES_JSON_PATH is not None:
+        main_features(files, FEATURES)
+        return
     song_tempos: list[tuple[Path, float]] = get_song_tempos(files)
     if OUTPUT_SORT:
         song_tempos = sort_song_tempos(song_tempos, reverse=OUTPUT_SORT_REVERSE)
@@ -4,21 +4,56 @@ OVERVIEW
 
 REQUIREMENTS
 - Minimum Python 3.8
+- numpy (optional, only for the log10 table functions)
 
 Date created: 14.10.2024
 This is a simple CLI I wrote to calculate the health of an 'immortal' boss in the popular game 'Clicker Heroes'
+
+The participation rates are all tenths, so the health is always an integer (1750 * rate in tenths * 3 ** ceil(level / 3)).
+get_immortal_health_exact computes it with integers only, so it doesn't overflow at high levels like the float version does
+(somewhere around level 2000). get_integer_scientific_notation formats such huge integers without converting them to a
+decimal string.
+
+For huge tables there is also a numpy path (write_immortal_health_log10_table) that works in log10 space for whole chunks
+of levels at once: log10(health) = log10(1750 * rate_tenths) + ceil(level / 3) * log10(3).
+It's float64, so its absolute error in log10(health) grows with the level - about 2e-16 * log10(health), i.e. under 1e-9
+relative error in the printed health up to level ~10 million. check_immortal_health_log10_range compares it with the exact engine.
+
+The reverse question ("what's the highest level whose HP fits in my DPS * time budget?") is answered by get_max_immortal_level.
+Health grows monotonically, so it estimates the level in closed form from log10(budget) and then binary searches a few
+levels around it with the exact engine. Usage without the interactive mode:
+python ClickerHeroesImmortalHealthCalculator.py --budget 1e50 2.5e300
+python ClickerHeroesImmortalHealthCalculator.py --dps 3.2e45 --seconds 30
+
+Many level ranges can be calculated from a script with --ranges. It reads one range per line ('min max' or 'min,max')
+from a file or from stdin ('-') and streams the health of every level to stdout as CSV or JSON lines:
+python ClickerHeroesImmortalHealthCalculator.py --ranges ranges.txt --format json
+A malformed line stops the stream with its line number on stderr (exit code 2).
+Every range is calculated with the incremental exact engine (iter_immortal_health_exact), so only one health value
+is kept in memory at a time, no matter how high the levels are.
 ----------------------------------------------------------------------------------------
 '''
 
-# TODO:
-# Finish getting the scientific notation for HPs
-
+import argparse
+import csv
+import json
+import sys
 import time
 import math
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, Context, Decimal, InvalidOperation, Overflow, localcontext
+from collections.abc import Iterable, Iterator
 from typing import Union, Literal
 
 
 HEALTH_SCIENTIFIC_NOTATION_THRESHOLD = 10 ** 7
+HEALTH_BASE_TENTH: int = 1750  # health_base / 10, multiplied by the participation rate in tenths
+LOG10_2: float = math.log10(2)
+# Integers with more bits than this are formatted from their top bits only (the rest is exact)
+SCIENTIFIC_NOTATION_EXACT_BITS: int = 256
+SCIENTIFIC_NOTATION_TOP_BITS: int = 64
+LOG10_TABLE_CHUNK_SIZE: int = 2 ** 16
+# The allowed error of the log10 path, relative to log10(health) (float64 epsilon is ~2.2e-16)
+LOG10_TABLE_RELATIVE_TOLERANCE: float = 1e-14
 
 
 def get_scientific_notation_if_above_threshold(number: float, threshold: float, precision: int = 2) -> str:
@@ -33,11 +68,65 @@ def get_scientific_notation_if_above_threshold(number: float, threshold: float,
     return str(number)
 
 
-def get_participation_rate(level: int) -> float:
+def get_integer_scientific_notation(number: int, precision: int = 2) -> str:
+    # Same output as '{:.<precision>e}'.format(number), but works for integers of any size.
+    # Small integers are rounded exactly. Big ones only use their bit length and top bits:
+    # log10(number) = log10(top bits) + shifted bits * log10(2), which is accurate to ~1e-9 relative
+    # even for numbers with millions of digits (plenty for the few digits we print).
+    if precision < 0:
+        raise RuntimeError(f"Precision must be greater than 0! Value: {precision}")
+
+    if number < 0:
+        return '-' + get_integer_scientific_notation(-number, precision)
+    if number == 0:
+        return f'{0:.{precision}e}'
+
+    bits: int = number.bit_length()
+    mantissa_digits: int
+    exponent: int
+
+    if bits <= SCIENTIFIC_NOTATION_EXACT_BITS:
+        digits: str = str(number)
+        exponent = len(digits) - 1
+        if exponent > precision:
+            # Round half to even on the dropped digits, like float formatting does
+            dropped: int = exponent - precision
+            half: int = 5 * 10 ** (dropped - 1)
+            remainder: int
+            mantissa_digits, remainder = divmod(number, 10 ** dropped)
+            if remainder > half or (remainder == half and mantissa_digits % 2 == 1):
+                mantissa_digits += 1
+        else:
+            mantissa_digits = number * 10 ** (precision - exponent)
+    else:
+        shift: int = bits - SCIENTIFIC_NOTATION_TOP_BITS
+        log10: float = math.log10(number >> shift) + shift * LOG10_2
+        exponent = math.floor(log10)
+        mantissa_digits = round(10 ** (log10 - exponent + precision))
+
+    if mantissa_digits >= 10 ** (precision + 1):  # e.g. 9.9996 rounded up to 10.000
+        mantissa_digits //= 10
+        exponent += 1
+
+    mantissa: str = str(mantissa_digits)
+    if precision > 0:
+        mantissa = f'{mantissa[0]}.{mantissa[1:]}'
+
+    return f'{mantissa}e{"-" if exponent < 0 else "+"}{abs(exponent):02}'
+
+
+def get_integer_scientific_notation_if_above_threshold(number: int, threshold: int, precision: int = 2) -> str:
+    if number >= threshold:
+        return get_integer_scientific_notation(number, precision)
+
+    return str(number)
+
+
+def get_participation_rate_tenths(level: int) -> int:
     # The participation rate on the first 6 immortal levels are 0.1, 0.3, 0.5, 0.2, 0.4, and 0.6. After that, it cycles through 0.3, 0.5, and 0.7.
-    unique_rates: list[float] = [0.1, 0.3, 0.5, 0.2, 0.4, 0.6]
+    unique_rates: list[int] = [1, 3, 5, 2, 4, 6]
     step: int = len(unique_rates)
-    participation_rate: float
+    participation_rate: int
 
     if level <= 0:
         participation_rate = 0
@@ -46,13 +135,17 @@ def get_participation_rate(level: int) -> float:
     else:
         levels_above_step: int = level - step
 
-        cycles: list[float] = [0.3, 0.5, 0.7]
+        cycles: list[int] = [3, 5, 7]
         cycles_amount: int = len(cycles)
         cycle: int = (levels_above_step - 1) % cycles_amount
         participation_rate = cycles[cycle]
 
     return participation_rate
 
+
+def get_participation_rate(level: int) -> float:
+    return get_participation_rate_tenths(level) / 10
+
 def get_immortal_health(level: int) -> int:
     health_base: int = 17500
     participation_rate: float = get_participation_rate(level)
@@ -60,10 +153,42 @@ def get_immortal_health(level: int) -> int:
     health: int = round(health_base * participation_rate * modifier)
     return health
 
+def get_immortal_health_exact(level: int) -> int:
+    # Exact for any level, 17500 * (rate_tenths / 10) is always the integer 1750 * rate_tenths.
+    # Levels <= 0 have no health (their rate is 0), and 3 ** ceil(level / 3) wouldn't be an integer there.
+    if level <= 0:
+        return 0
+    return HEALTH_BASE_TENTH * get_participation_rate_tenths(level) * 3 ** -(-level // 3)
+
+def iter_immortal_health_exact(min: int, max: int) -> Iterator[int]:
+    # Same as get_immortal_health_exact for every level, but the power of 3 is only computed once
+    # and then multiplied by 3 when the exponent goes up, instead of recomputing it for every level.
+    # The exponent starts at level 1 at the lowest, so everything stays an integer.
+    exponent: int = -(-(min if min > 1 else 1) // 3)
+    modifier: int = 3 ** exponent
+
+    for level in range(min, max + 1):
+        if level <= 0:
+            yield 0
+            continue
+        level_exponent: int = -(-level // 3)
+        if level_exponent != exponent:
+            modifier *= 3 ** (level_exponent - exponent)
+            exponent = level_exponent
+        yield HEALTH_BASE_TENTH * get_participation_rate_tenths(level) * modifier
+
 def get_number_difference(first: float, second: float) -> Union[int, float, Literal['infinitely']]:
     if second == 0:
         return 'infinitely'
     else:
+        if type(first) is int and type(second) is int:
+            # Dividing huge integers is slow. Dropping the same low bits from both keeps the ratio
+            # accurate to ~1e-19 while only the top bits of the smaller number are divided.
+            shift: int = min(first.bit_length(), second.bit_length()) - SCIENTIFIC_NOTATION_TOP_BITS
+            if shift > 0:
+                first >>= shift
+                second >>= shift
+
         ratio: float = first / second
         difference: float = ratio - 1
         return difference
@@ -106,31 +231,279 @@ def get_number_change_text(first: float, second: float, do_round: bool = True, r
     return text
     
 def get_immortal_health_for_range_message(min: int, max: int) -> str:
-    levels: range = range(min, (max + 1))
-    health_counts: list[int] = [get_immortal_health(level) for level in levels]
-    health_counts_amount: int = len(health_counts)
-
+    # Uses the exact integer engine, so this works for any level (the float one overflows around level 2000)
     messages: list[str] = []
+    previous_health: Union[None, int] = None
 
-    for current in range(health_counts_amount):
-        health: int = health_counts[current]
-        health_text: str = get_scientific_notation_if_above_threshold(health, HEALTH_SCIENTIFIC_NOTATION_THRESHOLD, 3)
-        level: int = min + current
+    for level, health in zip(range(min, max + 1), iter_immortal_health_exact(min, max)):
+        health_text: str = get_integer_scientific_notation_if_above_threshold(health, HEALTH_SCIENTIFIC_NOTATION_THRESHOLD, 3)
 
         message: str = f'Level {level} - {health_text} hp'
 
-        if current > 0:
-            previous: int = current - 1
-            previous_health: int = health_counts[previous]
+        if previous_health is not None:
             increase: str = get_number_change_text(health, previous_health, rounding_decimals=1)
 
             message += f' ({increase})'
 
         messages.append(message)
+        previous_health = health
 
     all_messages: str = '\n'.join(messages) 
     return all_messages
         
+def get_immortal_health_log10_range(min: int, max: int):
+    # log10(health) for every level in min..max as a numpy float64 array, computed all at once.
+    # Only levels >= 1 (level 0 and below have no health).
+    import numpy as np  # Imported here so the CLI works without numpy
+
+    if min < 1:
+        raise ValueError(f"The log10 path only works for levels >= 1! Value: {min}")
+
+    levels = np.arange(min, max + 1, dtype=np.int64)
+    unique_rates = np.array([1, 3, 5, 2, 4, 6], dtype=np.int64)
+    cycles = np.array([3, 5, 7], dtype=np.int64)
+    rates_tenths = np.where(levels <= len(unique_rates),
+                            unique_rates[np.minimum(levels, len(unique_rates)) - 1],
+                            cycles[(levels - len(unique_rates) - 1) % len(cycles)])
+    exponents = (levels + 2) // 3  # ceil(level / 3)
+
+    return np.log10(HEALTH_BASE_TENTH * rates_tenths) + exponents * math.log10(3)
+
+def check_immortal_health_log10_range(min: int, max: int, samples: int = 20) -> float:
+    # Compares the log10 path with the exact engine on up to 'samples' evenly spread levels (the exact health
+    # of a level in the millions takes a while, so keep it small).
+    # Returns the largest error relative to log10(health), raises if it's above LOG10_TABLE_RELATIVE_TOLERANCE.
+    import numpy as np
+
+    log10s = get_immortal_health_log10_range(min, max)
+    samples = samples if samples < len(log10s) else len(log10s)  # min and max are shadowed here
+    positions = np.unique(np.linspace(0, len(log10s) - 1, num=samples).astype(np.int64))
+    largest_error: float = 0
+
+    for position in positions.tolist():
+        exact: float = math.log10(get_immortal_health_exact(min + position))
+        error: float = abs(float(log10s[position]) - exact) / exact
+        largest_error = error if error > largest_error else largest_error
+
+    if largest_error > LOG10_TABLE_RELATIVE_TOLERANCE:
+        raise RuntimeError(f'The log10 path is too imprecise! Error: {largest_error}; Tolerance: {LOG10_TABLE_RELATIVE_TOLERANCE}')
+
+    return largest_error
+
+def write_immortal_health_log10_table(min: int, max: int, file, chunk_size: int = LOG10_TABLE_CHUNK_SIZE,
+                                      precision: int = 3) -> None:
+    # Writes a CSV table (level, health, log10_health, change_percent) to an open text file, one chunk of levels at a time.
+    # change_percent is the usual signed level-over-level change, computed from the difference of the log10s.
+    import numpy as np
+
+    file.write('level,health,log10_health,change_percent\n')
+    previous_log10: Union[None, float] = None
+
+    for chunk_min in range(min, max + 1, chunk_size):
+        chunk_max: int = chunk_min + chunk_size - 1 if chunk_min + chunk_size - 1 < max else max
+        log10s = get_immortal_health_log10_range(chunk_min, chunk_max)
+
+        exponents = np.floor(log10s)
+        mantissas = np.round(10 ** (log10s - exponents), precision)
+        carried = mantissas >= 10  # e.g. 9.9996 rounded up to 10.000
+        mantissas[carried] /= 10
+        exponents[carried] += 1
+
+        previous_log10s = np.empty_like(log10s)
+        previous_log10s[1:] = log10s[:-1]
+        previous_log10s[0] = np.nan if previous_log10 is None else previous_log10
+        changes = (10 ** (log10s - previous_log10s) - 1) * 100
+
+        lines: list[str] = [
+            f'{level},{mantissa:.{precision}f}e{"-" if exponent < 0 else "+"}{abs(int(exponent)):02},{log10:.12f},'
+            + ('' if change != change else f'{change:.1f}')  # change != change is only true for nan
+            for level, mantissa, exponent, log10, change
+            in zip(range(chunk_min, chunk_max + 1), mantissas.tolist(), exponents.tolist(), log10s.tolist(), changes.tolist())
+        ]
+        file.write('\n'.join(lines))
+        file.write('\n')
+        previous_log10 = float(log10s[-1])
+
+def parse_budget(text: str) -> int:
+    # Budgets can be written like '12345', '1.5e300' or '2.5E+1000' - floats would overflow past ~1e308.
+    # Health is always an integer, so only the integer part of the budget matters.
+    try:
+        budget: Decimal = Decimal(text.strip())
+    except InvalidOperation:
+        raise ValueError(f'The budget is not a number! Value: {text}') from None
+
+    if not budget.is_finite():
+        raise ValueError(f'The budget must be finite! Value: {text}')
+
+    return get_decimal_integer_part(budget)
+
+def get_decimal_integer_part(number: Decimal) -> int:
+    # int(number) is very slow for huge exponents, building the integer from the coefficient is much faster.
+    # Rounds towards 0, which is the floor for the positive budgets that matter.
+    sign, digits, exponent = number.as_tuple()
+
+    if exponent < 0 and -exponent > len(digits):
+        return 0  # Every digit is after the decimal point (e.g. 1e-100000000), no need to divide by a huge power
+
+    coefficient: int = int(''.join(map(str, digits)))
+    value: int = coefficient * 10 ** exponent if exponent >= 0 else coefficient // 10 ** -exponent
+
+    return -value if sign else value
+
+def multiply_decimals_exactly(first: Decimal, second: Decimal) -> Decimal:
+    # The default context rounds to 28 digits and overflows past 1e999999, a local one as wide as possible doesn't
+    # (the product of two finite decimals has at most as many digits as both of them together, so it's exact)
+    with localcontext(Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)):
+        return first * second
+
+def get_max_immortal_level(budget: int, memo: Union[None, dict[int, int]] = None) -> int:
+    # The highest immortal level whose health is lower than or equal to the budget (0 if not even level 1 fits).
+    # Health is strictly increasing from level 1, and every 3 levels it's multiplied by 3 (give or take the
+    # participation rate), so level ~= 3 * log3(budget / (1750 * rate)). That estimate lands within a few
+    # levels of the answer; a binary search with the exact engine then finds the exact level.
+    # Pass the same memo dict to share already calculated health values between many queries.
+    # Levels whose log10(health) is clearly away from log10(budget) are decided in log space, so the exact (and
+    # for huge levels, slow) integer health is only calculated for the levels right next to the budget.
+    if memo is None:
+        memo = {}
+
+    if budget < get_immortal_health_exact(1):
+        return 0
+
+    budget_log10: float = math.log10(budget)
+    log10_3: float = math.log10(3)
+
+    def fits(level: int) -> bool:
+        health_log10: float = math.log10(HEALTH_BASE_TENTH * get_participation_rate_tenths(level)) + math.ceil(level / 3) * log10_3
+        if abs(health_log10 - budget_log10) > 1e-9 * (1 + abs(budget_log10)):
+            return health_log10 < budget_log10
+
+        health: Union[None, int] = memo.get(level)
+        if health is None:
+            health = get_immortal_health_exact(level)
+            memo[level] = health
+        return health <= budget
+
+    # Using the middle participation rate (0.5), the real answer is at most a few levels away
+    estimate: int = math.floor(3 * (budget_log10 - math.log10(HEALTH_BASE_TENTH * 5)) / log10_3)
+    low: int = estimate - 3 if estimate - 3 > 1 else 1
+    high: int = estimate + 3 if estimate + 3 > low else low + 1
+
+    # Widening the bracket in the rare case that the estimate missed: health(low) <= budget < health(high)
+    while not fits(low):
+        low = low // 2 if low > 1 else 1
+    while fits(high):
+        high *= 2
+
+    while high - low > 1:
+        middle: int = (low + high) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle
+
+    return low
+
+def get_max_immortal_levels(budgets: list[int]) -> list[int]:
+    # Batch version of get_max_immortal_level, all queries share the calculated health values
+    memo: dict[int, int] = {}
+    return [get_max_immortal_level(budget, memo) for budget in budgets]
+
+def get_max_immortal_levels_message(budgets: list[int]) -> str:
+    messages: list[str] = []
+
+    for budget, level in zip(budgets, get_max_immortal_levels(budgets)):
+        budget_text: str = get_integer_scientific_notation_if_above_threshold(budget, HEALTH_SCIENTIFIC_NOTATION_THRESHOLD, 3)
+
+        if level == 0:
+            messages.append(f'Budget {budget_text} - not even level 1 fits')
+            continue
+
+        health_text: str = get_integer_scientific_notation_if_above_threshold(get_immortal_health_exact(level), HEALTH_SCIENTIFIC_NOTATION_THRESHOLD, 3)
+        messages.append(f'Budget {budget_text} - highest level {level} ({health_text} hp)')
+
+    return '\n'.join(messages)
+
+def parse_level_range(line: str) -> Union[None, tuple[int, int]]:
+    # 'min max' or 'min,max'. Empty lines and lines starting with '#' are skipped (None)
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    parts: list[str] = line.replace(',', ' ').split()
+    if len(parts) != 2:
+        raise ValueError(f'A range must be 2 levels! Value: {line}')
+
+    try:
+        min: int = int(parts[0])
+        max: int = int(parts[1])
+    except ValueError:
+        raise ValueError(f'The levels must be integers! Value: {line}') from None
+
+    if min > max:
+        min, max = max, min
+
+    return (min, max)
+
+def iter_level_ranges(lines: Iterable[str]) -> Iterator[tuple[int, int]]:
+    for line_number, line in enumerate(lines, start=1):
+        try:
+            level_range: Union[None, tuple[int, int]] = parse_level_range(line)
+        except ValueError as error:
+            raise ValueError(f'Line {line_number}: {error}') from None
+        if level_range is not None:
+            yield level_range
+
+def iter_immortal_health_rows(min: int, max: int) -> Iterator[dict]:
+    # One row per level, with the same texts as get_immortal_health_for_range_message (the first level has no change)
+    previous_health: Union[None, int] = None
+
+    for level, health in zip(range(min, max + 1), iter_immortal_health_exact(min, max)):
+        change: str = '' if previous_health is None else get_number_change_text(health, previous_health, rounding_decimals=1)
+
+        yield {
+            'min': min,
+            'max': max,
+            'level': level,
+            'health': get_integer_scientific_notation_if_above_threshold(health, HEALTH_SCIENTIFIC_NOTATION_THRESHOLD, 3),
+            'change': change,
+        }
+        previous_health = health
+
+def write_immortal_health_rows(level_ranges: Iterable[tuple[int, int]], file, output_format: str = 'csv') -> None:
+    # Streams the rows of every range to an open text file, nothing is collected in memory
+    if output_format not in ('csv', 'json'):
+        raise ValueError(f"Output format must be 'csv' or 'json'! Value: {output_format}")
+
+    fields: list[str] = ['min', 'max', 'level', 'health', 'change']
+    writer: Union[None, csv.DictWriter] = None
+
+    if output_format == 'csv':
+        writer = csv.DictWriter(file, fieldnames=fields, lineterminator='\n')
+        writer.writeheader()
+
+    for min, max in level_ranges:
+        for row in iter_immortal_health_rows(min, max):
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                file.write(json.dumps(row))
+                file.write('\n')
+
+def calculate_level_ranges_file(path: str, output_format: str) -> None:
+    # A bad line stops the stream with a one-line error on stderr (and exit code 2), the rows before it stay written
+    try:
+        if path == '-':
+            write_immortal_health_rows(iter_level_ranges(sys.stdin), sys.stdout, output_format)
+            return
+
+        with open(path, mode='rt', encoding='utf-8') as file:
+            write_immortal_health_rows(iter_level_ranges(file), sys.stdout, output_format)
+    except ValueError as error:
+        sys.stdout.flush()
+        print(f'--ranges error! {error}', file=sys.stderr)
+        raise SystemExit(2)
+
 def try_to_int(string: str) -> Union[Literal[False], int]:
     try:
         as_int: int = int(string)
@@ -199,13 +572,63 @@ def interactively_calculate_health_for_immortal_level() -> None:
     health_counts: str = get_immortal_health_for_range_message(min, max)
     fancy_print(health_counts)
 
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Calculates the health of immortal bosses in Clicker Heroes. Runs interactively without arguments.')
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument('--budget', nargs='+', default=None, help='Print the highest level whose health fits in each of these budgets (e.g. 1e50).')
+    parser.add_argument('--dps', default=None, help='Your DPS, the budget is DPS * seconds (use together with --seconds).')
+    parser.add_argument('--seconds', default=None, help='The time you have to kill the boss (use together with --dps).')
+    modes.add_argument('--ranges', default=None, help="Calculate the level ranges from this file ('-' for stdin), one 'min max' per line.")
+    parser.add_argument('--format', choices=('csv', 'json'), default='csv', help='The output format of --ranges (json is one object per line).')
+    arguments: argparse.Namespace = parser.parse_args()
+
+    if (arguments.dps is None) != (arguments.seconds is None):
+        parser.error('--dps and --seconds must be used together!')
+    if arguments.dps is not None and arguments.ranges is not None:
+        parser.error('--dps/--seconds cannot be used together with --ranges!')
+
+    # The budgets are checked here, so bad values end in a usage message instead of a traceback
+    arguments.budgets = []
+    try:
+        for budget in arguments.budget or []:
+            arguments.budgets.append(parse_budget(budget))
+        if arguments.dps is not None:
+            dps: Decimal = Decimal(arguments.dps.strip())
+            seconds: Decimal = Decimal(arguments.seconds.strip())
+            if not (dps.is_finite() and seconds.is_finite()):
+                parser.error(f'--dps and --seconds must be finite! Values: {arguments.dps}, {arguments.seconds}')
+            arguments.budgets.append(get_decimal_integer_part(multiply_decimals_exactly(dps, seconds)))
+    except InvalidOperation:
+        parser.error(f'--dps and --seconds must be numbers! Values: {arguments.dps}, {arguments.seconds}')
+    except Overflow:
+        parser.error(f'--dps * --seconds is too big! Values: {arguments.dps}, {arguments.seconds}')
+    except ValueError as error:
+        parser.error(str(error))
+
+    return arguments
+
 def main():
-    interactively_calculate_health_for_immortal_level()
+    arguments: argparse.Namespace = parse_arguments()
+    budgets: list[int] = arguments.budgets
+
+    if budgets:
+        print(get_max_immortal_levels_message(budgets))
+        return
+
+    if arguments.ranges is not None:
+        calculate_level_ranges_file(arguments.ranges, arguments.format)
+        return
 
     repeat_command: str = 'r'
-    input_value: str = fancy_input(f"The program ended! Press Enter to exit; or type '{repeat_command}' to repeat it: ")
-    
-    if input_value == repeat_command:
-        main()
 
-main()
+    while True:
+        interactively_calculate_health_for_immortal_level()
+
+        input_value: str = fancy_input(f"The program ended! Press Enter to exit; or type '{repeat_command}' to repeat it: ")
+
+        if input_value != repeat_command:
+            break
+
+
+if __name__ == '__main__':
+    main()
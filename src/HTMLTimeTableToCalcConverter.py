@@ -3,38 +3,558 @@
 OVERVIEW
 
 REQUIREMENTS
-- BeautifulSoup (bs4)
-- Pandas
+- none for .ods and .csv output
+- openpyxl (for .xlsx output)
+- Pandas (only for the old --writer pandas path)
+- BeautifulSoup (bs4) (only for the old get_table_rows_soup)
 
 Date created: around 2023
 This is a simple script I wrote to convert some HTML Time Table into the Libre Office Calc format
-You must statically define the file path!
+You must statically define the file path! (or pass it: python HTMLTimeTableToCalcConverter.py input.html --output output.ods)
 
 THIS SCRIPT IS VERY SIMPLE AND WAS WRITTEN FOR ONLY ONE SPECIFIC FORMAT. IT WILL 99% NOT WORK FOR YOUR USE CASE
+
+The file is read in chunks and parsed with an event-based parser (iter_table_rows), which hands out every row of the
+first table as soon as it closes. So huge exports don't have to be held in memory as a whole document tree.
+rowspan/colspan are expanded while parsing (the spanned text is repeated into every covered cell), so columns stay aligned.
+The rows then go straight into a streaming writer picked by the output's extension:
+- .ods  - a hand-written OpenDocument spreadsheet (LibreOffice Calc's own format), no dependencies
+- .csv  - plain csv
+- .xlsx - openpyxl's write-only workbook
+Cells that look like numbers are written as numbers. --writer pandas is the old DataFrame.to_excel path.
+--benchmark compares the wall time and peak memory of every writer.
+
+Batch mode converts every table (one sheet per table) of every file in a directory or glob, using a process pool:
+python HTMLTimeTableToCalcConverter.py --batch "exports/**/*.html" --output-dir converted --format ods
+A manifest (mtime, size and sha256 of every input) is kept in the output directory, so re-runs only convert changed files.
 ----------------------------------------------------------------------------------------
 """
 
 
-from bs4 import BeautifulSoup
-from pandas import DataFrame
+import argparse
+import concurrent.futures
+import csv
+import io
+import re
+import time
+import glob
+import hashlib
+import json
+import os
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from html.parser import HTMLParser
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
 
 
 PATH = r"C:\Users\You\Desktop\New Text Document.html"
+OUTPUT_PATH = 'output.xlsx'
+READ_CHUNK_SIZE: int = 2 ** 16  # Characters read from the file at a time
+WRITE_BUFFER_SIZE: int = 2 ** 20
+HASH_CHUNK_SIZE: int = 2 ** 20
+BATCH_MANIFEST_NAME: str = '.conversion_manifest.json'
+BATCH_INPUT_SUFFIXES: tuple[str, ...] = ('.html', '.htm')
+# Numbers like '12', '-3.5' or '1e3', but not '007' (which is probably meant to stay text)
+CELL_NUMBER_PATTERN: re.Pattern = re.compile(r'[+-]?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|[+-]?\.\d+')
+ODS_MIMETYPE: str = 'application/vnd.oasis.opendocument.spreadsheet'
+ODS_MANIFEST: str = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="1.2">\n'
+    f' <manifest:file-entry manifest:full-path="/" manifest:media-type="{ODS_MIMETYPE}"/>\n'
+    ' <manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>\n'
+    '</manifest:manifest>\n'
+)
+ODS_CONTENT_START: str = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"'
+    ' xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"'
+    ' xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" office:version="1.2">'
+    '<office:body><office:spreadsheet>'
+)
+ODS_CONTENT_END: str = '</office:spreadsheet></office:body></office:document-content>\n'
+
+
+class SpanGrid:
+    # Turns rows of (text, rowspan, colspan) cells into aligned rows of texts, one row at a time.
+    # Only a list of "pending" cells per column is kept (how many more rows a rowspan still covers, and its text),
+    # so the memory depends on the width of the table, not on its length.
+    # A spanned cell's text is repeated into every cell it covers (or left empty with fill_spans=False).
+
+    def __init__(self, fill_spans: bool = True) -> None:
+        self.fill_spans: bool = fill_spans
+        self.pending_rows: list[int] = []
+        self.pending_texts: list[str] = []
+
+    def take_pending(self, row: list[str], column: int) -> None:
+        row.append(self.pending_texts[column])
+        self.pending_rows[column] -= 1
+
+    def expand(self, cells: list[tuple[str, int, int]]) -> list[str]:
+        row: list[str] = []
+        column: int = 0
+
+        for text, rowspan, colspan in cells:
+            # Skipping the columns still covered by cells from the rows above
+            while column < len(self.pending_rows) and self.pending_rows[column] > 0:
+                self.take_pending(row, column)
+                column += 1
+
+            for offset in range(colspan):
+                filled_text: str = text if offset == 0 or self.fill_spans else ''
+                row.append(filled_text)
+
+                if column == len(self.pending_rows):
+                    self.pending_rows.append(0)
+                    self.pending_texts.append('')
+                self.pending_rows[column] = rowspan - 1
+                self.pending_texts[column] = text if self.fill_spans else ''
+                column += 1
+
+        # Columns after the last cell can still be covered from above
+        last_pending: int = max((index for index, rows in enumerate(self.pending_rows) if rows > 0), default=-1)
+        while column <= last_pending:
+            if self.pending_rows[column] > 0:
+                self.take_pending(row, column)
+            else:
+                row.append('')
+            column += 1
+
+        return row
+
+
+def get_span(attrs: list[tuple[str, str | None]], name: str, limit: int) -> int:
+    # rowspan/colspan, limited like browsers do. rowspan="0" means "until the end of the table".
+    for key, value in attrs:
+        if key == name:
+            try:
+                span: int = int(value or 1)
+            except ValueError:
+                return 1
+            if span == 0 and name == 'rowspan':
+                return limit
+            return span if 1 <= span <= limit else (limit if span > limit else 1)
+    return 1
+
+
+class TableRowParser(HTMLParser):
+    # Collects the rows of the first <table>, or of every top-level table with first_only=False
+    # (nested tables are only read as the text of their cell).
+    # Finished rows are put in self.rows as (table index, row), the caller takes them out after every feed().
+    # Cells and rows that aren't closed explicitly are closed by the next cell/row, like browsers do.
+    # rowspan/colspan are expanded by a SpanGrid as every row closes, so the columns stay aligned.
+
+    def __init__(self, first_only: bool = True, fill_spans: bool = True) -> None:
+        super().__init__(convert_charrefs=True)
+        self.first_only: bool = first_only
+        self.rows: list[tuple[int, list[str]]] = []
+        self.table_index: int = -1
+        self.table_depth: int = 0
+        self.finished: bool = False
+        self.fill_spans: bool = fill_spans
+        self.grid: SpanGrid = SpanGrid(fill_spans)
+        self.row: list[tuple[str, int, int]] | None = None
+        self.cell: list[str] | None = None
+        self.cell_spans: tuple[int, int] = (1, 1)
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.finished:
+            return
+
+        if tag == 'table':
+            self.table_depth += 1
+            if self.table_depth == 1:
+                self.table_index += 1
+                self.grid = SpanGrid(self.fill_spans)
+        elif self.table_depth != 1:
+            return
+        elif tag == 'tr':
+            self.close_row()
+            self.row = []
+        elif tag in ('td', 'th'):
+            self.close_cell()
+            if self.row is None:
+                self.row = []
+            self.cell = []
+            self.cell_spans = (get_span(attrs, 'rowspan', 65534), get_span(attrs, 'colspan', 1000))
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.finished or self.table_depth == 0:
+            return
+
+        if tag == 'table':
+            self.table_depth -= 1
+            if self.table_depth == 0:
+                self.close_row()
+                self.finished = self.first_only
+        elif self.table_depth != 1:
+            return
+        elif tag == 'tr':
+            self.close_row()
+        elif tag in ('td', 'th'):
+            self.close_cell()
+
+    def handle_data(self, data: str) -> None:
+        if self.cell is not None:
+            self.cell.append(data)
+
+    def close_cell(self) -> None:
+        if self.cell is not None and self.row is not None:
+            self.row.append((''.join(self.cell), *self.cell_spans))
+        self.cell = None
+
+    def close_row(self) -> None:
+        self.close_cell()
+        if self.row is not None:
+            self.rows.append((self.table_index, self.grid.expand(self.row)))
+        self.row = None
+
+
+def iter_table_rows(path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[list[str]]:
+    # Yields the rows (lists of cell texts) of the first table in the file, reading it chunk by chunk
+    for _, row in iter_tables_rows(path, first_only=True, chunk_size=chunk_size):
+        yield row
+
+
+def iter_tables(path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[tuple[str, Iterator[list[str]]]]:
+    # Yields (sheet name, rows) for every table in the file, still in a single streaming pass.
+    # Each table's rows must be read fully before moving to the next table (the writers do that).
+    tables_rows: Iterator[tuple[int, list[str]]] = iter_tables_rows(path, first_only=False, chunk_size=chunk_size)
+
+    for table_index, table_rows in groupby(tables_rows, key=itemgetter(0)):
+        yield f'Table{table_index + 1}', (row for _, row in table_rows)
+
+
+def iter_tables_rows(path: str, first_only: bool = False,
+                     chunk_size: int = READ_CHUNK_SIZE) -> Iterator[tuple[int, list[str]]]:
+    parser: TableRowParser = TableRowParser(first_only=first_only)
+
+    with open(path, mode='rt', encoding='utf-8') as file:
+        while not parser.finished and (chunk := file.read(chunk_size)):
+            parser.feed(chunk)
+            yield from parser.rows
+            parser.rows.clear()
+
+    parser.close()
+    parser.close_row()
+    yield from parser.rows
+
+
+def get_table_rows_soup(path: str) -> list[list[str]]:
+    # The old way - builds the whole document tree first
+    from bs4 import BeautifulSoup
+
+    with open(path, mode='rt',
+              encoding='utf-8') as file:
+        calc_html: str = file.read()
+
+    soup: BeautifulSoup = BeautifulSoup(calc_html, 'html.parser')
+    table = soup.find('table')
+
+    data = []
+
+    for row in table.find_all('tr'):
+        row_data = [cell.text for cell in row.find_all(['td', 'th'])]
+        data.append(row_data)
+
+    return data
+
+
+def get_cell_number(value: str) -> float | int | None:
+    # The number a cell holds, or None if it's text. Decided cell by cell, as the rows stream past.
+    stripped: str = value.strip()
+
+    if not CELL_NUMBER_PATTERN.fullmatch(stripped):
+        return None
+
+    number: float = float(stripped)
+    return int(number) if number.is_integer() and abs(number) < 2 ** 53 else number
+
+
+def write_ods_row(file: io.TextIOWrapper, row: list[str]) -> None:
+    cells: list[str] = []
+
+    for value in row:
+        number: float | int | None = get_cell_number(value)
+        if number is None:
+            cells.append(f'<table:table-cell office:value-type="string"><text:p>{escape(value)}</text:p></table:table-cell>')
+        else:
+            cells.append(f'<table:table-cell office:value-type="float" office:value="{number!r}"><text:p>{escape(value)}</text:p></table:table-cell>')
+
+    file.write(f'<table:table-row>{"".join(cells)}</table:table-row>')
+
+
+def write_rows_ods(sheets: Iterable[tuple[str, Iterable[list[str]]]], path: Path) -> None:
+    # A minimal OpenDocument spreadsheet. content.xml is compressed into the zip while it's being written,
+    # so only the current row is kept in memory.
+    with zipfile.ZipFile(path, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        # The mimetype has to be the first file and must not be compressed
+        archive.writestr(zipfile.ZipInfo('mimetype'), ODS_MIMETYPE, compress_type=zipfile.ZIP_STORED)
+        archive.writestr('META-INF/manifest.xml', ODS_MANIFEST)
+
+        with archive.open('content.xml', mode='w', force_zip64=True) as binary:
+            file: io.TextIOWrapper = io.TextIOWrapper(binary, encoding='utf-8', write_through=False)
+            file.write(ODS_CONTENT_START)
+            sheets_amount: int = 0
+
+            for name, rows in sheets:
+                file.write(f'<table:table table:name={quoteattr(name)}>')
+                for row in rows:
+                    write_ods_row(file, row)
+                file.write('</table:table>')
+                sheets_amount += 1
+
+            if sheets_amount == 0:  # A spreadsheet needs at least one sheet, even without any tables
+                file.write('<table:table table:name="Sheet1"><table:table-row><table:table-cell/></table:table-row></table:table>')
+
+            file.write(ODS_CONTENT_END)
+            file.flush()
+            file.detach()
+
+
+def write_rows_csv(sheets: Iterable[tuple[str, Iterable[list[str]]]], path: Path) -> None:
+    # CSV has no sheets, so the tables are written one after another
+    with open(path, mode='wt', encoding='utf-8', newline='', buffering=WRITE_BUFFER_SIZE) as file:
+        writer = csv.writer(file)
+        for _, rows in sheets:
+            writer.writerows(rows)
+
+
+def write_rows_xlsx(sheets: Iterable[tuple[str, Iterable[list[str]]]], path: Path) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)  # Rows are written to a temporary file as they are appended
+
+    for name, rows in sheets:
+        sheet = workbook.create_sheet(title=name[:31])  # Excel's limit
+        for row in rows:
+            sheet.append([value if (number := get_cell_number(value)) is None else number for value in row])
+
+    if not workbook.worksheets:  # A workbook needs at least one sheet, even without any tables
+        workbook.create_sheet(title='Sheet1')
+
+    workbook.save(path)
+
+
+def write_rows_pandas(sheets: Iterable[tuple[str, Iterable[list[str]]]], path: Path) -> None:
+    # The old way - every row of a table is collected into a DataFrame first (the first row is the header)
+    from pandas import DataFrame, ExcelWriter
+
+    with ExcelWriter(path) as writer:
+        for name, rows in sheets:
+            data: list[list[str]] = list(rows)
+            data_frame: DataFrame = DataFrame(data[1:], columns=data[0])
+            data_frame.to_excel(writer, sheet_name=name[:31], index=False)
+
+
+WRITERS: dict[str, Callable[[Iterable[tuple[str, Iterable[list[str]]]], Path], None]] = {
+    'ods': write_rows_ods,
+    'csv': write_rows_csv,
+    'xlsx': write_rows_xlsx,
+    'pandas': write_rows_pandas,
+}
+PANDAS_FORMATS: tuple[str, ...] = ('ods', 'xlsx')  # The formats pandas' ExcelWriter picks an engine for
+
+
+def get_writer_name(output_path: Path, writer_name: str | None = None) -> str:
+    writer_name = writer_name or output_path.suffix[1:].lower()
+
+    if writer_name not in WRITERS:
+        raise ValueError(f"Unknown writer! Value: {writer_name}; Allowed: {', '.join(WRITERS)}")
+
+    return writer_name
+
+
+def convert_table(input_path: str | Path, output_path: str | Path, writer_name: str | None = None) -> None:
+    output_path = Path(output_path)
+    writer = WRITERS[get_writer_name(output_path, writer_name)]
+    writer([('Sheet1', iter_table_rows(str(input_path)))], output_path)
+
+
+def convert_tables(input_path: str | Path, output_path: str | Path, writer_name: str | None = None) -> None:
+    # Every table of the file, one sheet per table
+    output_path = Path(output_path)
+    writer = WRITERS[get_writer_name(output_path, writer_name)]
+    writer(iter_tables(str(input_path)), output_path)
+
+
+def get_file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, mode='rb') as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def collect_batch_inputs(pattern: str) -> tuple[Path, list[Path]]:
+    # A directory (searched recursively for .html/.htm files) or a glob like 'exports/**/*.html'.
+    # Also returns the base directory, the outputs keep the inputs' paths relative to it.
+    base: Path = Path(pattern)
+
+    if base.is_dir():
+        files: list[Path] = sorted(path for path in base.rglob('*')
+                                   if path.is_file() and path.suffix.lower() in BATCH_INPUT_SUFFIXES)
+        return base, files
+
+    files = sorted(Path(path) for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    if not files:
+        return Path('.'), []
+
+    return Path(os.path.commonpath([path.parent.absolute() for path in files])), files
+
+
+def load_batch_manifest(path: Path) -> dict[str, dict]:
+    if not path.exists():
+        return {}
+
+    with open(path, mode='rt', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_batch_manifest(path: Path, manifest: dict[str, dict]) -> None:
+    # Written to a temporary file first, so an interrupted run never leaves a broken manifest
+    temporary: Path = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+    temporary.replace(path)
+
+
+def is_batch_input_unchanged(input_path: Path, output_path: Path, entry: dict | None) -> tuple[bool, dict]:
+    # Cheap check first (mtime and size), the hash only when the mtime changed (e.g. the file was copied again).
+    # Returns whether the conversion can be skipped and the manifest entry describing the input right now.
+    stat: os.stat_result = input_path.stat()
+    current: dict = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'output': str(output_path)}
+
+    if entry is None or entry.get('output') != str(output_path) or not output_path.exists() or entry.get('size') != stat.st_size:
+        current['sha256'] = get_file_hash(input_path)
+        return False, current
+
+    if entry.get('mtime_ns') == stat.st_mtime_ns:
+        current['sha256'] = entry.get('sha256')
+        return True, current
+
+    current['sha256'] = get_file_hash(input_path)
+    return current['sha256'] == entry.get('sha256'), current
+
+
+def check_batch_writer(output_format: str, writer_name: str | None) -> None:
+    # The outputs are named after the format, so the writer has to write that format
+    # (pandas picks its Excel engine by the extension, so it can write .ods and .xlsx, but not .csv)
+    if writer_name is None or writer_name == output_format:
+        return
+    if writer_name == 'pandas' and output_format in PANDAS_FORMATS:
+        return
+
+    raise ValueError(f"The writer doesn't write the batch format! Writer: {writer_name}; Format: {output_format}")
+
+
+def convert_batch(pattern: str, output_dir: Path, output_format: str = 'ods', writer_name: str | None = None,
+                  workers: int | None = None) -> None:
+    # Converts every table of every matching file (one sheet per table), spread over a process pool.
+    # Inputs that didn't change since the last run (see the manifest in output_dir) are skipped.
+    check_batch_writer(output_format, writer_name)
+    base, inputs = collect_batch_inputs(pattern)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path: Path = output_dir / BATCH_MANIFEST_NAME
+    manifest: dict[str, dict] = load_batch_manifest(manifest_path)
+
+    jobs: dict[str, tuple[Path, Path, dict]] = {}
+    skipped: int = 0
+
+    for input_path in inputs:
+        relative: Path = input_path.absolute().relative_to(base.absolute())
+        output_path: Path = (output_dir / relative).with_suffix(f'.{output_format}')
+        key: str = str(input_path.absolute())
+        unchanged, entry = is_batch_input_unchanged(input_path, output_path, manifest.get(key))
+
+        if unchanged:
+            manifest[key] = entry  # The mtime may have changed even though the content didn't
+            skipped += 1
+        else:
+            jobs[key] = (input_path, output_path, entry)
+
+    print(f"Files: {len(inputs)} | To convert: {len(jobs)} | Unchanged: {skipped}")
+    failed: int = 0
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as exec:
+        futures: dict[concurrent.futures.Future, str] = {}
+        for key, (input_path, output_path, _) in jobs.items():
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            futures[exec.submit(convert_tables, input_path, output_path, writer_name)] = key
+
+        for future in concurrent.futures.as_completed(futures):
+            key = futures[future]
+            input_path, output_path, entry = jobs[key]
+            try:
+                future.result()
+            except Exception as error:
+                failed += 1
+                manifest.pop(key, None)
+                print(f"FAILED | {input_path} | {error!r}")
+                continue
+            manifest[key] = entry
+            print(f"Converted | {input_path} -> {output_path}")
+
+    save_batch_manifest(manifest_path, manifest)
+    print(f"Done! Converted: {len(jobs) - failed} | Failed: {failed} | Unchanged: {skipped}")
+
+
+def measure_conversion(input_path: str, output_path: str, writer_name: str) -> tuple[float, int | None]:
+    # Runs in a fresh process, so the peak memory (max RSS, in KiB on Linux) belongs to this conversion only
+    start: float = time.perf_counter()
+    convert_table(input_path, output_path, writer_name)
+    elapsed: float = time.perf_counter() - start
+
+    try:
+        import resource  # Not available on Windows
+        return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return elapsed, None
+
+
+def benchmark_writers(input_path: str, output_dir: Path) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    suffixes: dict[str, str] = {'ods': 'ods', 'csv': 'csv', 'xlsx': 'xlsx', 'pandas': 'xlsx'}
 
+    print(f"{'WRITER':<8} | {'SECONDS':>9} | PEAK RSS (KiB)")
 
-with open(PATH, mode='rt',
-          encoding='utf-8') as file:
-    calc_html: str = file.read()
+    for writer_name, suffix in suffixes.items():
+        output_path: Path = output_dir / f'benchmark_{writer_name}.{suffix}'
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as exec:
+            try:
+                elapsed, peak = exec.submit(measure_conversion, input_path, str(output_path), writer_name).result()
+            except ImportError as error:
+                print(f"{writer_name:<8} | skipped ({error})")
+                continue
+        print(f"{writer_name:<8} | {elapsed:>9.3f} | {peak}")
 
-soup: BeautifulSoup = BeautifulSoup(calc_html, 'html.parser')
-table = soup.find('table')
 
-data = []
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Converts the first table of an HTML file into a spreadsheet.")
+    parser.add_argument('input', nargs='?', default=PATH, help="The HTML file. Defaults to PATH.")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="The output file, its extension picks the writer (.ods, .csv, .xlsx).")
+    parser.add_argument('--writer', choices=tuple(WRITERS), default=None, help="Use this writer no matter the extension.")
+    parser.add_argument('--benchmark', action='store_true', help="Compare every writer on the input (outputs go next to --output).")
+    parser.add_argument('--batch', default=None, help="Convert every table of every file in this directory or glob (one sheet per table).")
+    parser.add_argument('--output-dir', default='converted', help="Where --batch writes its outputs and manifest.")
+    parser.add_argument('--format', choices=('ods', 'csv', 'xlsx'), default='ods', help="The output format of --batch.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of --batch worker processes. Defaults to the cpu count.")
+    arguments: argparse.Namespace = parser.parse_args()
 
-for row in table.find_all('tr'):
-    row_data = [cell.text for cell in row.find_all(['td', 'th'])]
-    data.append(row_data)
+    if arguments.batch is not None:
+        try:
+            check_batch_writer(arguments.format, arguments.writer)
+        except ValueError as error:
+            parser.error(str(error))
+        convert_batch(arguments.batch, Path(arguments.output_dir), arguments.format, arguments.writer, arguments.workers)
+    elif arguments.benchmark:
+        benchmark_writers(arguments.input, Path(arguments.output).parent)
+    else:
+        convert_table(arguments.input, arguments.output, arguments.writer)
 
-data_frame: DataFrame = DataFrame(data[1:], columns=data[0])
 
-data_frame.to_excel('output.xlsx', index=False)
+if __name__ == '__main__':
+    main()
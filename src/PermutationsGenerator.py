@@ -4,16 +4,49 @@
 
   REQUIREMENTS
   - none
+  - numpy (optional, only for iter_permutation_batches and --output-dir)
 
   Date created: around 2023
   This program takes a permutation like [1,2,3,4] and returns its every possible permutation with allowed repetitions.
   In: [1,2,3,4] Out: [1, 1, 1, 1] [1, 1, 1, 2] [1, 1, 1, 3] [1, 1, 1, 4] [1, 1, 2, 1] and so on...
-  The input is STATIC!!! You must edit the code to change it!
+  Without arguments the input is the static example below. You can also pass the items and size:
+  python PermutationsGenerator.py 1 2 3 4 --size 4
+  python PermutationsGenerator.py a b c d e f g h i j --size 8 --output-dir out --format bin --workers 8
+  The --output-dir mode splits the permutations between processes, each one writing its own shard file.
+  'bin' shards hold one row of item indexes per permutation (see manifest.json for the dtype),
+  so they can be opened with numpy.memmap. 'csv' shards hold the items themselves.
+
+  get_permutations builds the whole list at once. For bigger inputs use iter_permutations,
+  which yields the permutations one at a time in the same order.
+  rank/unrank and PermutationsSequence jump straight to any position of that order.
+  iter_permutation_batches streams the same order as (batch, size) numpy arrays.
+
+  iter_constrained_permutations takes the constraints up front instead of filtering the full output afterwards,
+  so branches that can't produce a valid permutation are never walked. count_constrained_permutations
+  gives the exact amount of them without enumerating anything. The constraints:
+  - max_count - how many times one item can be used (1 means no repeats, so size < len gives k-of-n arrangements),
+                either one number for every item or a dict of item -> limit
+  - ordered   - False yields every group once (combinations), with the items in the list's order
+  - prefix    - the permutations must start with these items
+  python PermutationsGenerator.py a b c d e --size 3 --max-count 1 --combinations --prefix a
 
 ----------------------------------------------------------------------------------------
 """
 
-from math import ceil
+import argparse
+import concurrent.futures
+import csv
+import io
+import json
+import math
+import os
+from collections.abc import Iterator, Sequence
+from itertools import islice
+from pathlib import Path
+
+
+WRITE_BUFFER_SIZE: int = 2 ** 24  # 16 MiB
+EXAMPLE_ITEMS: list = [1, 2, 3, 4]  # Used when no items are passed
 
 
 def list_my_list(my_list: list) -> list:
@@ -25,12 +58,21 @@ def list_my_list(my_list: list) -> list:
     return my_listed_list
 
 
-def get_permutations(my_list: list, size: None | int = None) -> list:
+def check_permutation_size(my_list: list, size: None | int) -> int:
+    if size is not None and size < 0:
+        raise ValueError(f"The size cannot be negative! Value: {size}")
+
     size = size or len(my_list)
 
     if size > len(my_list):
         raise ValueError("The value of size passed to the function cannot be greater than the length of the passed list!")
 
+    return size
+
+
+def get_permutations(my_list: list, size: None | int = None) -> list:
+    size = check_permutation_size(my_list, size)
+
     my_list = list_my_list(my_list)
 
     def add_one_permutation_depth(current_permutation: list) -> list:
@@ -55,21 +97,472 @@ def get_permutations(my_list: list, size: None | int = None) -> list:
     return recursively_add_one_permutation_depth(my_list)
 
 
-def example1():
-    my_size: int = 4
-    my_array: list = [1, 2, 3, 4]
+def iter_permutations(my_list: list, size: None | int = None, reuse_buffer: bool = False) -> Iterator[list]:
+    # Same order as get_permutations, but only one permutation exists at a time.
+    # It works like an odometer - the last position spins the fastest.
+    # With reuse_buffer=True the SAME list is yielded every time (and changed in place),
+    # so copy it if you want to keep it around.
+    size = check_permutation_size(my_list, size)
+    items: list = list(my_list)
+    items_amount: int = len(items)
+
+    if items_amount == 0:
+        return
+
+    indexes: list[int] = [0] * size
+    buffer: list = [items[0]] * size
+    last_item_index: int = items_amount - 1
+
+    while True:
+        yield buffer if reuse_buffer else buffer.copy()
+
+        position: int = size - 1
+        while position >= 0 and indexes[position] == last_item_index:
+            indexes[position] = 0
+            buffer[position] = items[0]
+            position -= 1
+
+        if position < 0:
+            return
+
+        indexes[position] += 1
+        buffer[position] = items[indexes[position]]
+
+
+def get_permutations_count(my_list: list, size: None | int = None) -> int:
+    size = check_permutation_size(my_list, size)
+    return len(my_list) ** size
+
+
+def unrank(my_list: list, index: int, size: None | int = None) -> list:
+    # The permutation at the passed position of get_permutations' output.
+    # The order is just counting in base len(my_list), so the digits of the index are the item indexes.
+    size = check_permutation_size(my_list, size)
+    items_amount: int = len(my_list)
+    count: int = items_amount ** size
+
+    if index < 0:
+        index += count
+    if not 0 <= index < count:
+        raise IndexError(f"Permutation index out of range! Value: {index}; Count: {count}")
+
+    permutation: list = [None] * size
+
+    for position in range(size - 1, -1, -1):
+        index, digit = divmod(index, items_amount)
+        permutation[position] = my_list[digit]
+
+    return permutation
+
+
+def get_item_positions(my_list: list) -> None | dict:
+    # item -> first index, so rank doesn't have to search my_list for every item.
+    # Unhashable items fall back to searching (None).
+    try:
+        positions: dict = {}
+        for position, item in enumerate(my_list):
+            positions.setdefault(item, position)
+        return positions
+    except TypeError:
+        return None
+
+
+def rank(my_list: list, permutation: list, positions: None | dict = None) -> int:
+    # The position of the passed permutation in get_permutations' output (the inverse of unrank).
+    # If my_list contains duplicates, the first matching position is returned.
+    # Pass positions from get_item_positions when ranking many permutations of the same list.
+    check_permutation_size(my_list, len(permutation))
+    items_amount: int = len(my_list)
+    index: int = 0
+
+    for item in permutation:
+        try:
+            digit: int = positions[item] if positions is not None else my_list.index(item)
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"The permutation contains an item that isn't in the list! Value: {item!r}") from None
+        index = index * items_amount + digit
+
+    return index
+
+
+class PermutationsSequence(Sequence):
+    # A read-only, list-like view over get_permutations' output that doesn't store any permutation.
+    # Every lookup is an unrank, so len(), indexing, slicing and iterating over ranges are all cheap.
+    # Slicing returns another PermutationsSequence, which is handy for splitting work between workers.
+
+    def __init__(self, my_list: list, size: None | int = None, indexes: None | range = None) -> None:
+        self.my_list: list = list(my_list)
+        self.size: int = check_permutation_size(self.my_list, size)
+        self.indexes: range = indexes if indexes is not None else range(len(self.my_list) ** self.size)
+        self.positions: None | dict = get_item_positions(self.my_list)
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return PermutationsSequence(self.my_list, self.size, self.indexes[key])
+        return unrank(self.my_list, self.indexes[key], self.size)
+
+    def __iter__(self) -> Iterator[list]:
+        for index in self.indexes:
+            yield unrank(self.my_list, index, self.size)
+
+    def __contains__(self, permutation) -> bool:
+        try:
+            return self.rank(permutation) in self.indexes
+        except ValueError:
+            return False
+
+    def __repr__(self) -> str:
+        return f"PermutationsSequence({self.my_list!r}, size={self.size}, indexes={self.indexes!r})"
+
+    def rank(self, permutation: list) -> int:
+        # The position in the FULL output, not in this (possibly sliced) view
+        if len(permutation) != self.size:
+            raise ValueError(f"The permutation must have {self.size} items! Value: {permutation!r}")
+        return rank(self.my_list, permutation, self.positions)
+
+    def index(self, permutation, start: int = 0, stop: None | int = None) -> int:
+        try:
+            position: int = self.indexes.index(self.rank(permutation))
+        except ValueError:
+            raise ValueError(f"{permutation!r} is not in the sequence") from None
+        if position < start or (stop is not None and position >= stop):
+            raise ValueError(f"{permutation!r} is not in the sequence")
+        return position
+
+    def count(self, permutation) -> int:
+        return 1 if permutation in self else 0
+
+
+def get_item_limits(my_list: list, size: int, max_count: None | int | dict = None) -> list[int]:
+    # How many times the item at each position can still be used. A limit above size is the same as no limit.
+    # With duplicates in my_list each position gets its own limit (like get_permutations treats them as different).
+    if max_count is None:
+        return [size] * len(my_list)
+    if isinstance(max_count, dict):
+        for item, limit in max_count.items():
+            if limit < 0:
+                raise ValueError(f"The max count cannot be negative! Item: {item!r}; Value: {limit}")
+        return [min(max_count.get(item, size), size) for item in my_list]
+    if max_count < 0:
+        raise ValueError(f"The max count cannot be negative! Value: {max_count}")
+    return [min(max_count, size)] * len(my_list)
+
+
+def get_prefix_state(my_list: list, size: int, max_count: None | int | dict, ordered: bool,
+                     prefix: Sequence) -> None | tuple[list[int], list[int]]:
+    # The item positions of the prefix and the limits left after it, or None if no permutation can start with it
+    if len(prefix) > size:
+        raise ValueError(f"The prefix cannot be longer than the size! Value: {list(prefix)!r}; Size: {size}")
+
+    limits: list[int] = get_item_limits(my_list, size, max_count)
+    positions: None | dict = get_item_positions(my_list)
+    prefix_indexes: list[int] = []
+
+    for item in prefix:
+        try:
+            index: int = positions[item] if positions is not None else my_list.index(item)
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"The prefix contains an item that isn't in the list! Value: {item!r}") from None
+        if limits[index] == 0 or (not ordered and prefix_indexes and index < prefix_indexes[-1]):
+            return None
+        limits[index] -= 1
+        prefix_indexes.append(index)
+
+    return prefix_indexes, limits
+
+
+def iter_constrained_permutations(my_list: list, size: None | int = None, max_count: None | int | dict = None,
+                                  ordered: bool = True, prefix: Sequence = ()) -> Iterator[list]:
+    # Yields the permutations of get_permutations' output that match the constraints, in the same order.
+    # Works like iter_permutations' odometer, but a position only spins through the items that are still allowed,
+    # and for combinations (ordered=False) it stops as soon as the items left can't fill the remaining positions.
+    size = check_permutation_size(my_list, size)
+    items: list = list(my_list)
+    items_amount: int = len(items)
+    state: None | tuple[list[int], list[int]] = get_prefix_state(items, size, max_count, ordered, prefix)
+
+    if state is None or items_amount == 0:
+        return
+
+    prefix_indexes, limits = state
+    first_free: int = len(prefix_indexes)
+
+    if sum(limits) < size - first_free:
+        return
+
+    indexes: list[int] = prefix_indexes + [-1] * (size - first_free)
+    buffer: list = [items[index] for index in prefix_indexes] + [None] * (size - first_free)
+
+    if first_free == size:
+        yield buffer
+        return
+
+    position: int = first_free
+
+    while position >= first_free:
+        index: int = indexes[position]
+
+        if index >= 0:
+            limits[index] += 1  # Giving back the item that was here before trying the next one
+        elif not ordered and position > 0:
+            index = indexes[position - 1] - 1  # Combinations never go back to an earlier item
+
+        index += 1
+        while index < items_amount and limits[index] == 0:
+            index += 1
+
+        if index < items_amount and not ordered and sum(limits[index:]) < size - position:
+            index = items_amount  # The later items can't fill the rest, and they only get fewer from here
+
+        if index == items_amount:
+            indexes[position] = -1
+            position -= 1
+            continue
+
+        limits[index] -= 1
+        indexes[position] = index
+        buffer[position] = items[index]
+
+        if position == size - 1:
+            yield buffer.copy()
+        else:
+            position += 1
+
+
+def count_constrained_permutations(my_list: list, size: None | int = None, max_count: None | int | dict = None,
+                                   ordered: bool = True, prefix: Sequence = ()) -> int:
+    # The exact amount of permutations iter_constrained_permutations would yield, without generating them.
+    # Goes item by item, counting the ways to fill each number of positions with the items so far.
+    # When an item is used n times, those n positions can be any of the filled ones (a binomial) if ordered.
+    size = check_permutation_size(my_list, size)
+    state: None | tuple[list[int], list[int]] = get_prefix_state(list(my_list), size, max_count, ordered, prefix)
+
+    if state is None:
+        return 0
+
+    prefix_indexes, limits = state
+    free: int = size - len(prefix_indexes)
+
+    if not ordered and prefix_indexes:
+        limits = limits[prefix_indexes[-1]:]
+
+    ways: list[int] = [1] + [0] * free
+
+    for limit in limits:
+        new_ways: list[int] = ways.copy()
+        for filled in range(free):
+            if ways[filled] == 0:
+                continue
+            for used in range(1, min(limit, free - filled) + 1):
+                new_ways[filled + used] += ways[filled] * (math.comb(filled + used, used) if ordered else 1)
+        ways = new_ways
+
+    return ways[free]
+
+
+def get_index_dtype(items_amount: int):
+    # The smallest unsigned numpy dtype that can hold every item index
+    import numpy as np
+    return np.min_scalar_type(max(items_amount - 1, 0))
+
+
+def get_items_array(my_list: list):
+    # The items as a 1D numpy array. Mixed types (np.asarray would turn [1, 'a'] into strings) and
+    # items that numpy would split into more dimensions (like tuples) are kept as they are in an object array.
+    import numpy as np
+
+    if len({type(item) for item in my_list}) <= 1:
+        items = np.asarray(my_list)
+        if items.ndim == 1:
+            return items
+
+    items = np.empty(len(my_list), dtype=object)
+    items[:] = my_list
+    return items
+
+
+def iter_permutation_batches(my_list: list, size: None | int = None, batch_size: int = 2 ** 16,
+                             start: int = 0, stop: None | int = None, as_indexes: bool = False):
+    # Yields C-contiguous numpy arrays of shape (batch, size) in get_permutations' order.
+    # Each batch is a block of consecutive indexes split into base-len(my_list) digits with
+    # vectorized floor division/modulo, so no Python object is created per permutation.
+    # start/stop select a range of indexes (like PermutationsSequence slicing).
+    # With as_indexes=True the arrays hold item indexes instead of the items themselves.
+    import numpy as np  # Imported here so the rest of the script works without numpy
+
+    size = check_permutation_size(my_list, size)
+    items_amount: int = len(my_list)
+    count: int = items_amount ** size
+
+    if batch_size <= 0:
+        raise ValueError(f"Batch size must be greater than 0! Value: {batch_size}")
+    if count > np.iinfo(np.int64).max:
+        raise ValueError(f"Too many permutations for 64-bit indexes! Count: {count}")
+
+    stop = count if stop is None else min(stop, count)
+    items = get_items_array(my_list)
+    digit_dtype = get_index_dtype(items_amount)
+    # The weight of each position, e.g. [64, 16, 4, 1] for 4 items of size 4
+    powers = items_amount ** np.arange(size - 1, -1, -1, dtype=np.int64)
+
+    for batch_start in range(start, stop, batch_size):
+        batch_indexes = np.arange(batch_start, min(batch_start + batch_size, stop), dtype=np.int64)
+        digits = ((batch_indexes[:, None] // powers) % items_amount).astype(digit_dtype)
+
+        if as_indexes:
+            yield digits
+        else:
+            yield items[digits]
+
+
+def split_index_range(count: int, shards_amount: int) -> list[range]:
+    # Splits range(count) into (at most) shards_amount contiguous, nearly equal ranges
+    shards_amount = max(1, min(shards_amount, count))
+    shard_size, remainder = divmod(count, shards_amount)
+    shards: list[range] = []
+    start: int = 0
+
+    for shard in range(shards_amount):
+        stop: int = start + shard_size + (1 if shard < remainder else 0)
+        shards.append(range(start, stop))
+        start = stop
+
+    return shards
+
+
+def write_permutations_shard(my_list: list, size: int, start: int, stop: int, path: Path,
+                             file_format: str, batch_size: int = 2 ** 16) -> int:
+    # Runs inside a worker process. Writes the permutations from start to stop in large buffered writes.
+    # Both formats go through the item indexes. 'csv' looks the items up and quotes them with the csv module,
+    # so items with commas, quotes or newlines stay readable.
+    written: int = 0
+
+    with open(path, mode='wb', buffering=WRITE_BUFFER_SIZE) as file:
+        text_file = io.TextIOWrapper(file, encoding='utf-8', newline='') if file_format == 'csv' else None
+        writer = csv.writer(text_file) if text_file is not None else None
+
+        for batch in iter_permutation_batches(my_list, size, batch_size, start, stop, as_indexes=True):
+            if writer is None:
+                file.write(memoryview(batch).cast('B'))
+            else:
+                writer.writerows([[my_list[index] for index in row] for row in batch.tolist()])
+            written += len(batch)
+
+        if text_file is not None:
+            text_file.flush()
+            text_file.detach()
+
+    return written
+
+
+def write_permutations_sharded(my_list: list, size: None | int, output_dir: Path, file_format: str = 'bin',
+                               workers: None | int = None, shards_amount: None | int = None) -> Path:
+    # Splits the permutations between a process pool and writes one shard file per range.
+    # Returns the path of the manifest describing the shards.
+    if file_format not in ('bin', 'csv'):
+        raise ValueError(f"File format must be 'bin' or 'csv'! Value: {file_format}")
+
+    size = check_permutation_size(my_list, size)
+    count: int = get_permutations_count(my_list, size)
+    workers = workers or os.cpu_count() or 1
+    shards: list[range] = split_index_range(count, shards_amount or workers)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths: list[Path] = [output_dir / f'shard_{number:05}.{file_format}' for number in range(len(shards))]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as exec:
+        futures = [exec.submit(write_permutations_shard, my_list, size, shard.start, shard.stop, path, file_format)
+                   for shard, path in zip(shards, paths)]
+        written: list[int] = [future.result() for future in futures]
+
+    manifest: dict = {
+        'items': my_list,
+        'size': size,
+        'count': count,
+        'format': file_format,
+        'dtype': get_index_dtype(len(my_list)).str if file_format == 'bin' else None,
+        'shards': [{'path': path.name, 'start': shard.start, 'stop': shard.stop, 'rows': rows}
+                   for shard, path, rows in zip(shards, paths, written)],
+    }
+    manifest_path: Path = output_dir / 'manifest.json'
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+
+    return manifest_path
+
+
+def parse_items(items: list[str]) -> list:
+    # Numbers stay numbers if every item is one, otherwise everything stays a string
+    try:
+        return [int(item) for item in items]
+    except ValueError:
+        return items
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generates every permutation (with repetitions) of the passed items.")
+    parser.add_argument('items', nargs='*', help="The items to permute. Defaults to the static example.")
+    parser.add_argument('--size', type=int, default=None, help="The size of each permutation. Defaults to the amount of items.")
+    parser.add_argument('--output-dir', type=Path, default=None,
+                        help="Write the permutations to shard files in this directory instead of printing them.")
+    parser.add_argument('--format', choices=('bin', 'csv'), default='bin', help="The format of the shard files.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes. Defaults to the cpu count.")
+    parser.add_argument('--shards', type=int, default=None, help="Number of shard files. Defaults to the number of workers.")
+    parser.add_argument('--max-count', type=int, default=None, help="How many times one item can be used (1 - no repeats).")
+    parser.add_argument('--combinations', action='store_true', help="Yield every group of items once, ignoring their order.")
+    parser.add_argument('--prefix', nargs='+', default=[], help="The permutations must start with these items.")
+    arguments: argparse.Namespace = parser.parse_args()
+
+    if arguments.size is not None and arguments.size < 0:
+        parser.error(f"--size cannot be negative! Value: {arguments.size}")
+    if arguments.output_dir is not None and (arguments.max_count is not None or arguments.combinations or arguments.prefix):
+        parser.error("The constraints can't be used with --output-dir.")
+
+    return arguments
+
+
+def main() -> None:
+    arguments: argparse.Namespace = parse_arguments()
+
+    my_array: list = parse_items(arguments.items) if arguments.items else EXAMPLE_ITEMS
+    # The prefix is parsed like the items, so it matches them
+    prefix: list = parse_items(arguments.items + arguments.prefix)[len(arguments.items):] if arguments.prefix else []
+    constraints: dict = {'max_count': arguments.max_count, 'ordered': not arguments.combinations, 'prefix': prefix}
+
+    if arguments.output_dir is None:
+        example1(my_array, arguments.size, **constraints)
+        return
+
+    manifest_path: Path = write_permutations_sharded(my_array, arguments.size, arguments.output_dir, arguments.format,
+                                                     arguments.workers, arguments.shards)
+    print(f"End! - {get_permutations_count(my_array, arguments.size)} Permutations written! Manifest: {manifest_path}")
+
+
+def example1(my_array: None | list = None, my_size: None | int = None, max_count: None | int = None,
+             ordered: bool = True, prefix: Sequence = ()):
+    my_array = my_array or EXAMPLE_ITEMS
+    my_size = check_permutation_size(my_array, my_size)
 
-    my_permutations: list = get_permutations(my_array, size=my_size)
+    if max_count is None and ordered and not prefix:
+        my_permutations: Iterator[list] = iter_permutations(my_array, size=my_size)
+    else:
+        my_permutations = iter_constrained_permutations(my_array, my_size, max_count, ordered, prefix)
+        print(f"Constraints: max count {max_count}, {'ordered' if ordered else 'combinations'}, prefix {list(prefix)}"
+              f"\nExpected count: {count_constrained_permutations(my_array, my_size, max_count, ordered, prefix)}")
+    permutations_count: int = 0
 
     print(f"My Array: {my_array}"
           f"\nThe size of each permutation: {my_size}"
           f"\nPermutations:\n")
 
-    for i in range(1, ceil((len(my_permutations)/my_size) + 1)):
-        print(*my_permutations[my_size * (i - 1): my_size * i])
+    # Printing my_size permutations per line, only one line is kept in memory
+    while line := list(islice(my_permutations, my_size)):
+        print(*line)
+        permutations_count += len(line)
 
-    print(f"\nEnd! - {len(my_permutations)} Permutations!")
+    print(f"\nEnd! - {permutations_count} Permutations!")
 
 
 if __name__ == '__main__':
-    example1()
+    main()
@@ -8,35 +8,275 @@ REQUIREMENTS
 Date created: 18.06.2023
 This is a simple script I made for a StackOverflow answer. It finds all repeated
 substrings of the passed string with the passed size and minimum repeats count.
+
+Besides the plain list of substrings there are a few more result modes:
+- positions - (offset, length, count) triples pointing into the original string
+- top       - the k repeats with the highest count or length (heap backed)
+- maximal   - only repeats that aren't contained in a longer repeat with the same count
+
+OnlineRepeatIndex does the same for text that keeps growing (e.g. a log stream). It's a suffix automaton that takes
+appended chunks in amortized O(chunk) time and can answer the repeats at any moment. It can be saved to and loaded
+from a file, so restarts don't have to scan the history again.
 ----------------------------------------------------------------------------------------
 """
 
 
-from collections import Counter
+import heapq
+import pickle
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Literal
 
 
-def main():
+def count_substrings_of_size(my_string: str, size: int) -> dict[str, list[int]]:
+    # Maps every substring of the given size to [first offset, count]. Only one size is
+    # kept in memory at a time instead of every substring of every size.
+    counts: dict[str, list[int]] = {}
+
+    for index in range(len(my_string) + 1 - size):
+        substring: str = my_string[index:index + size]
+        entry: list[int] | None = counts.get(substring)
+
+        if entry is None:
+            counts[substring] = [index, 1]
+        else:
+            entry[1] += 1
+
+    return counts
+
+
+def iter_repeat_levels(my_string: str, min_size: int = 2,
+                       min_repeats: int = 2) -> Iterator[dict[str, list[int]]]:
+    # Yields the repeated substrings of each size (from min_size upwards).
+    # A substring can never occur more often than its own prefix, so once a size has
+    # no repeats, no longer size can have any either and we can stop early.
+    for size in range(min_size, len(my_string) + 1):  # If You don't want to count \
+        # the entire string as a substring, just remove the '+1'
+        level: dict[str, list[int]] = {
+            substring: entry for substring, entry in count_substrings_of_size(my_string, size).items()
+            if entry[1] >= min_repeats
+        }
+
+        if not level:
+            return
+
+        yield level
+
+
+def iter_repeat_positions(my_string: str, min_size: int = 2,
+                          min_repeats: int = 2) -> Iterator[tuple[int, int, int]]:
+    # (offset, length, count) - the substring itself is my_string[offset:offset + length]
+    for level in iter_repeat_levels(my_string, min_size, min_repeats):
+        for substring, (offset, count) in level.items():
+            yield offset, len(substring), count
+
+
+def iter_maximal_repeat_positions(my_string: str, min_size: int = 2,
+                                  min_repeats: int = 2) -> Iterator[tuple[int, int, int]]:
+    # A repeat is suppressed if it's contained in a longer repeat with the same count.
+    # It's enough to look one character further - if 's' is inside a longer 't' with the
+    # same count, then the one-character extension of 's' towards 't' has that count too.
+    previous: dict[str, list[int]] | None = None
+
+    for level in iter_repeat_levels(my_string, min_size, min_repeats):
+        if previous is not None:
+            yield from pick_maximal(previous, level)
+        previous = level
+
+    if previous is not None:
+        yield from pick_maximal(previous, {})
+
+
+def pick_maximal(level: dict[str, list[int]],
+                 next_level: dict[str, list[int]]) -> Iterator[tuple[int, int, int]]:
+    absorbed: set[str] = set()
+
+    for longer, (_, longer_count) in next_level.items():
+        for shorter in (longer[:-1], longer[1:]):
+            entry: list[int] | None = level.get(shorter)
+            if entry is not None and entry[1] == longer_count:
+                absorbed.add(shorter)
+
+    for substring, (offset, count) in level.items():
+        if substring not in absorbed:
+            yield offset, len(substring), count
+
+
+def find_repeat_positions(my_string: str, min_size: int = 2, min_repeats: int = 2,
+                          maximal_only: bool = False) -> list[tuple[int, int, int]]:
+    if maximal_only:
+        return list(iter_maximal_repeat_positions(my_string, min_size, min_repeats))
+    return list(iter_repeat_positions(my_string, min_size, min_repeats))
+
+
+def find_top_repeats(my_string: str, k: int, min_size: int = 2, min_repeats: int = 2,
+                     by: Literal['count', 'length'] = 'count',
+                     maximal_only: bool = False) -> list[tuple[int, int, int]]:
+    # Keeps only a heap of k triples, no matter how many repeats there are.
+    # Ties are broken by the other value and then by the earliest offset.
+    if by == 'count':
+        def sort_key(triple: tuple[int, int, int]) -> tuple[int, int, int]:
+            return triple[2], triple[1], -triple[0]
+    elif by == 'length':
+        def sort_key(triple: tuple[int, int, int]) -> tuple[int, int, int]:
+            return triple[1], triple[2], -triple[0]
+    else:
+        raise ValueError(f"'by' must be 'count' or 'length'! Value: {by}")
+
+    if maximal_only:
+        triples: Iterator[tuple[int, int, int]] = iter_maximal_repeat_positions(my_string, min_size, min_repeats)
+    else:
+        triples = iter_repeat_positions(my_string, min_size, min_repeats)
+
+    return heapq.nlargest(k, triples, key=sort_key)
 
-    def find_unique_repeat_substrings(my_string: str, min_size: int = 2,
-                                      min_repeats: int = 2) -> list:
-        substrings = []
-        my_string_len = len(my_string)
 
-        # Generating all possible sizes of a string. In example, from 'str' it'd \
-        # be 1, 2 and 3 if min_size was 1. If min_size was 2 it'd be 2 and 3.
-        for size in range(min_size, my_string_len + 1):  # If You don't want to count \
-            # the entire string as a substring, just remove the '+1'
-            # Generate all possible slices of that string with the passed size.
-            for index in range(my_string_len + 1 - size):
-                substrings.append(my_string[index:index + size])
+def positions_to_substrings(my_string: str, positions: list[tuple[int, int, int]]) -> list[str]:
+    return [my_string[offset:offset + length] for offset, length, _ in positions]
 
-        # Filtering the substrings that don't comply to min_repeats.
-        return [substring for substring, count in Counter(substrings).items()
-                if count >= min_repeats]
 
+def find_unique_repeat_substrings(my_string: str, min_size: int = 2,
+                                  min_repeats: int = 2) -> list:
+    # Generating all possible sizes of a string. In example, from 'str' it'd \
+    # be 1, 2 and 3 if min_size was 1. If min_size was 2 it'd be 2 and 3.
+    # Then filtering the substrings that don't comply to min_repeats.
+    return positions_to_substrings(my_string, find_repeat_positions(my_string, min_size, min_repeats))
+
+
+class OnlineRepeatIndex:
+    # A suffix automaton over everything appended so far. Every state stands for a group of substrings that end at
+    # the same set of positions, so they all occur the same number of times. Those are the lengths
+    # length[link] + 1 ... length[state], and first_end is where the first occurrence ends.
+    # The occurrence counts are only calculated when asked for (one pass over the states).
+
+    def __init__(self) -> None:
+        self.transitions: list[dict[str, int]] = [{}]
+        self.link: list[int] = [-1]
+        self.length: list[int] = [0]
+        self.first_end: list[int] = [-1]
+        self.is_clone: list[bool] = [False]
+        self.last: int = 0
+        self.chunks: list[str] = []
+        self.text_length: int = 0
+
+    def __len__(self) -> int:
+        return self.text_length
+
+    def add_state(self, length: int, first_end: int, is_clone: bool, transitions: dict[str, int], link: int) -> int:
+        self.transitions.append(transitions)
+        self.link.append(link)
+        self.length.append(length)
+        self.first_end.append(first_end)
+        self.is_clone.append(is_clone)
+        return len(self.length) - 1
+
+    def append(self, chunk: str) -> None:
+        # The standard online suffix automaton construction, one character at a time
+        transitions: list[dict[str, int]] = self.transitions
+        link: list[int] = self.link
+        length: list[int] = self.length
+
+        for character in chunk:
+            current: int = self.add_state(length[self.last] + 1, self.text_length, False, {}, -1)
+            state: int = self.last
+
+            while state != -1 and character not in transitions[state]:
+                transitions[state][character] = current
+                state = link[state]
+
+            if state == -1:
+                link[current] = 0
+            else:
+                next_state: int = transitions[state][character]
+                if length[state] + 1 == length[next_state]:
+                    link[current] = next_state
+                else:
+                    clone: int = self.add_state(length[state] + 1, self.first_end[next_state], True,
+                                                transitions[next_state].copy(), link[next_state])
+                    while state != -1 and transitions[state].get(character) == next_state:
+                        transitions[state][character] = clone
+                        state = link[state]
+                    link[next_state] = clone
+                    link[current] = clone
+
+            self.last = current
+            self.text_length += 1
+
+        self.chunks.append(chunk)
+
+    def get_counts(self) -> list[int]:
+        # Occurrences of every state - each original state is one end position, which also counts for
+        # every state on its suffix link path. Longer states are handled first (a counting sort by length).
+        states_amount: int = len(self.length)
+        buckets: list[int] = [0] * (self.text_length + 1)
+        for state_length in self.length:
+            buckets[state_length] += 1
+        for index in range(1, len(buckets)):
+            buckets[index] += buckets[index - 1]
+        order: list[int] = [0] * states_amount
+        for state in range(states_amount - 1, -1, -1):
+            buckets[self.length[state]] -= 1
+            order[buckets[self.length[state]]] = state
+
+        counts: list[int] = [0 if clone else 1 for clone in self.is_clone]
+        counts[0] = 0
+        for state in reversed(order):
+            if self.link[state] > 0:
+                counts[self.link[state]] += counts[state]
+
+        return counts
+
+    def iter_repeat_positions(self, min_size: int = 2, min_repeats: int = 2) -> Iterator[tuple[int, int, int]]:
+        # (offset, length, count) of every substring with length >= min_size that occurs >= min_repeats times
+        # (in no particular order). offset is where the first occurrence starts.
+        counts: list[int] = self.get_counts()
+
+        for state in range(1, len(self.length)):
+            count: int = counts[state]
+            if count < min_repeats:
+                continue
+            shortest: int = self.length[self.link[state]] + 1
+            for size in range(shortest if shortest > min_size else min_size, self.length[state] + 1):
+                yield self.first_end[state] - size + 1, size, count
+
+    def find_repeat_positions(self, min_size: int = 2, min_repeats: int = 2) -> list[tuple[int, int, int]]:
+        # The same list (and order) as the module level find_repeat_positions would give for the whole text
+        return sorted(self.iter_repeat_positions(min_size, min_repeats), key=lambda triple: (triple[1], triple[0]))
+
+    def get_text(self) -> str:
+        if len(self.chunks) > 1:
+            self.chunks = [''.join(self.chunks)]
+        return self.chunks[0] if self.chunks else ''
+
+    def save(self, path: Path) -> None:
+        with open(path, mode='wb') as file:
+            pickle.dump(self.__dict__, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: Path) -> 'OnlineRepeatIndex':
+        # Only load snapshots you made yourself, pickle can run code while loading
+        index: OnlineRepeatIndex = cls()
+        with open(path, mode='rb') as file:
+            index.__dict__.update(pickle.load(file))
+        return index
+
+
+def main():
     my_lorem_ipsum = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore et dolore magna aliqua. Praesent tristique magna sit amet purus gravida quis blandit. Imperdiet sed euismod nisi porta lorem. Vel quam elementum pulvinar etiam non quam. Proin nibh nisl condimentum id. Mi eget mauris pharetra et ultrices. In vitae turpis massa sed. Elementum sagittis vitae et leo duis. Feugiat in ante metus dictum at tempor commodo ullamcorper a. Tortor aliquam nulla facilisi cras. Dui nunc mattis enim ut tellus. Congue mauris rhoncus aenean vel elit scelerisque mauris pellentesque. Morbi tincidunt augue interdum velit euismod.Ut tellus elementum sagittis vitae et leo duis ut diam. Sollicitudin tempor id eu nisl nunc. In ante metus dictum at tempor commodo. Ultrices vitae auctor eu augue ut lectus arcu. Turpis in eu mi bibendum. In egestas erat imperdiet sed euismod. Accumsan sit amet nulla facilisi morbi tempus iaculis. Nisi lacus sed viverra tellus in. Velit egestas duid ornare. Cras pulvinar mattis nunc sed blandit libero volutpat sed cras. Varius vel pharetra vel turpis. Tristique senectus et netus et malesuada.'
     print(find_unique_repeat_substrings(my_lorem_ipsum, 4, 4))
 
+    print("\nTop 5 by count (offset, length, count):")
+    print(find_top_repeats(my_lorem_ipsum, 5, 4, 4, by='count'))
+
+    print("\nMaximal repeats only:")
+    print(positions_to_substrings(my_lorem_ipsum, find_repeat_positions(my_lorem_ipsum, 4, 4, maximal_only=True)))
+
+    print("\nOnline index, fed in chunks:")
+    index: OnlineRepeatIndex = OnlineRepeatIndex()
+    for start in range(0, len(my_lorem_ipsum), 100):
+        index.append(my_lorem_ipsum[start:start + 100])
+    print(positions_to_substrings(index.get_text(), index.find_repeat_positions(4, 4)))
+
 
 if __name__ == '__main__':
     main()